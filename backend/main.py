@@ -3,20 +3,25 @@ backend/main.py — PNG Property Intelligence Dashboard API
 FastAPI backend for Render Web Service deployment.
 """
 from __future__ import annotations
-import asyncio, json, logging, os, random, uuid
+import asyncio, logging, os, random, statistics, threading, uuid, zlib
+import numpy as np
+import orjson
 from dotenv import load_dotenv
 load_dotenv()
-from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from itertools import islice
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional, List
+from types import MappingProxyType
+from typing import Optional, List, Union
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response, status, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
 from services.scoring_engine import calculate_investment_score
 from jose import JWTError, jwt
 import bcrypt
@@ -57,17 +62,27 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 
+# Comma-separated list, e.g. "https://png-property-dashboard.onrender.com". Auth uses bearer
+# tokens rather than cookies, so credentials stay off and preflights can be cached by the browser.
+ALLOWED_ORIGINS = tuple(o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",") if o.strip())
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=False,
+    allow_methods=("GET", "POST"),
+    allow_headers=("*",),
+    max_age=86400,
 )
 
-scrape_jobs: dict[str, dict] = {}
+scrape_jobs: OrderedDict[str, dict] = OrderedDict() # Fallback job store when REDIS_URL is unset, in queue order
+MAX_LOCAL_JOBS = 200
+REDIS_URL = os.getenv("REDIS_URL", "")
+JOB_TTL_SECONDS = 86400
+SCRAPE_CONCURRENCY = max(1, int(os.getenv("SCRAPE_CONCURRENCY", "4"))) # Sources scraped at once, one browser context each
 OUTPUT_FILE = Path(os.getenv("OUTPUT_FILE", (Path(__file__).parent.parent / "output" / "png_listings_latest.json").resolve()))
 OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
 HISTORY_FILE = Path(os.getenv("HISTORY_FILE", (Path(__file__).parent.parent / "output" / "suburb_history.json").resolve()))
@@ -116,6 +131,16 @@ SUBURB_COORDS = {
     "June Valley":{"lat": -9.4400, "lng": 147.1600},
 }
 
+# Static payloads for /api/suburbs and /api/sources, built once at import
+_SUBURBS_PAYLOAD = {"suburbs":[{"name":k,"lat":v["lat"],"lng":v["lng"]} for k,v in SUBURB_COORDS.items()]}
+_SOURCES_PAYLOAD = {"sources":[
+    "Hausples", "PNG Real Estate", "Marketmeri.com (Real Estate Section)", "PNG Buy n Rent",
+    "LJ Hookers", "Ray White PNG", "Strickland Real Estate", "The Professionals",
+    "Century 21 Siule Real Estate", "Budget Real Estate", "Arthur Strachan", "DAC Real Estate",
+    "Kenmok Real Estate", "Pacific Palms Property", "Credit Corporation Properties", "Nambawan Super (Property)", "AAA Properties",
+    "Edai Town Estate", "Tuhava", "Facebook Marketplace"
+]}
+
 BENCHMARKS = {
     "Waigani":4470,"Boroko":3150,"Gerehu":1880,"Gordons":5957,
     "Hohola":1600,"Tokarara":2275,"Koki":2900,"Badili":3325,
@@ -142,6 +167,16 @@ TIERS = {
 }
 BASES = [6000, 3500, 2000, 1200]
 
+# (benchmark, lat, lng) per suburb, resolved once instead of on every _market_score call
+_DEFAULT_MARKET = (2800, -9.44, 147.18)
+_SUBURB_MARKET = {
+    s: (BENCHMARKS.get(s, 2800), SUBURB_COORDS.get(s, {}).get("lat", -9.44), SUBURB_COORDS.get(s, {}).get("lng", 147.18))
+    for s in {**SUBURB_COORDS, **BENCHMARKS}
+}
+_LABEL_DEAL = MappingProxyType({"label": "Deal", "color": "#4ade80"})
+_LABEL_OVERPRICED = MappingProxyType({"label": "Overpriced", "color": "#f87171"})
+_LABEL_FAIR = MappingProxyType({"label": "Fair", "color": "#facc15"})
+
 def _get_db():
     mongo_url = os.getenv("MONGODB_URL","")
     if not mongo_url: return None
@@ -177,29 +212,58 @@ class UserInDB(User):
     hashed_password: Optional[str] = None
 
 users_db: dict[str, UserInDB] = {}
-_listings_cache: dict = {"data": [], "timestamp": None}
+_listings_cache: dict = {"data": [], "mtime": None}
+_listings_lock = threading.Lock()
+
+def _output_mtime() -> int:
+    try: return OUTPUT_FILE.stat().st_mtime_ns
+    except FileNotFoundError: return 0
 
 def _load_listings() -> list[dict]:
-    # Performance Optimization: Cache deduplicated listings based on file modification time
-    mtime = OUTPUT_FILE.stat().st_mtime if OUTPUT_FILE.exists() else 0
-    if _listings_cache["timestamp"] == mtime and _listings_cache["data"]:
+    # Performance Optimization: Cache deduplicated listings keyed on the file's mtime_ns,
+    # so a cache hit costs one stat() instead of a JSON parse + regroup.
+    mtime = _output_mtime()
+    if _listings_cache["mtime"] == mtime:
+        return _listings_cache["data"]
+    with _listings_lock:
+        # Another thread may have rebuilt the cache while we waited for the lock
+        if _listings_cache["mtime"] == mtime:
+            return _listings_cache["data"]
+        processed, clean = _read_listings()
+        # Only a non-empty, error-free read is pinned to this mtime: an empty or failed
+        # Mongo read, or a file caught mid-write, is retried on the next request
+        if processed and clean:
+            _listings_cache["data"] = processed
+            _listings_cache["mtime"] = mtime
+        return processed
+
+async def _load_listings_async() -> list[dict]:
+    # Cache hits are served from memory on the event loop; a rebuild (disk/MongoDB) runs in a worker thread
+    if _listings_cache["mtime"] == _output_mtime():
         return _listings_cache["data"]
+    return await asyncio.to_thread(_load_listings)
 
+def _read_listings() -> tuple[list[dict], bool]:
+    """Grouped listings from MongoDB or the output file, and whether the read was error-free."""
     raw_ls = []
+    clean = True
     db = _get_db()
     if db is not None:
         try:
             raw_ls = list(db["listings"].find({},{"_id":0}).limit(2000))
         except Exception as e:
             log.warning(f"MongoDB query failed: {e}")
+            clean = False
 
     if not raw_ls:
         if OUTPUT_FILE.exists():
             try:
-                with open(OUTPUT_FILE) as f: raw_ls = json.load(f)
+                raw_ls = orjson.loads(OUTPUT_FILE.read_bytes())
+                clean = True
             except Exception as e:
                 log.error(f"Failed to load {OUTPUT_FILE}: {e}")
                 raw_ls = []
+                clean = False
         else:
             raw_ls = []
 
@@ -229,12 +293,7 @@ def _load_listings() -> list[dict]:
             log.error(f"Error hydrating listing {d.get('listing_id')}: {e}")
 
     grouped_objects = group_listings(objects)
-    processed = [o.to_dict() for o in grouped_objects]
-
-    # Update cache
-    _listings_cache["data"] = processed
-    _listings_cache["timestamp"] = mtime
-    return processed
+    return [o.to_dict() for o in grouped_objects], clean
 
 def get_user_by_identifier(identifier: str) -> Optional[UserInDB]:
     # Check in-memory first
@@ -293,93 +352,83 @@ async def startup_event():
         log.error(f"Failed to seed admin user: {e}")
 
 def _mock_listings() -> list[dict]:
+    # Seeded, so only the timestamps (relative to now) differ between calls. Built fresh each
+    # time so callers may mutate their copy; the vectorized build is cheap.
     suburbs=["Waigani","Boroko","Gerehu","Gordons","Hohola","Tokarara","Koki","Badili","Six Mile","Eight Mile","Morata","Erima"]
     sources=["Hausples","The Professionals","Ray White PNG","Century 21 PNG","Marketmeri.com (Real Estate Section)","Facebook Marketplace","SRE PNG","DAC Properties"]
     types=["House","Apartment","Townhouse","Studio","Room","Compound"]
-    no_verify={"Facebook Marketplace"}
-
-    rng=random.Random(42); now=datetime.now(timezone.utc); listings=[]
-    for i in range(240):
-        suburb=rng.choice(suburbs); src=rng.choice(sources); ptype=rng.choice(types)
-        is_sale = rng.random() < 0.2
-
-        beds=rng.choice([1,2,3,4,5]) if ptype not in ("Studio","Room") else 1
-        base=BASES[TIERS.get(suburb,3)-1]
-
-        if is_sale:
-            price = int(rng.gauss(base * 12 * 10, base * 12 * 2))
-            price_raw = f"K{price:,}"
-        else:
-            price=max(800,int(rng.gauss(base,base*0.18)))
-            price_raw = f"K{price:,}/month"
-
-        scraped=now-timedelta(days=rng.randint(0,30), hours=rng.randint(0,24))
-        first_seen = scraped - timedelta(days=rng.randint(0,14))
-        sqm = rng.randint(40, 400) if ptype != "Room" else rng.randint(10, 25)
-
-        is_verified = src not in no_verify
-        # Randomly verify some FB listings via the new landline registry logic
-        if src == "Facebook Marketplace" and rng.random() < 0.15:
-            is_verified = True
-
-        health = rng.randint(40, 95) if src == "Facebook Marketplace" else rng.randint(85, 100)
-
-        t_status = rng.choice(["State Lease", "Customary (ILG)", "Unknown / TBC"])
-        l_flags = []
-        if t_status == "Unknown / TBC" and rng.random() < 0.3: l_flags = ["Dispute"]
-        if t_status == "State Lease" and rng.random() < 0.05: l_flags = ["Caveat"]
-
-        listings.append({"listing_id":f"lst{i:04d}","source_site":src,"title":f"{beds} Bedroom {ptype} – {suburb}",
+    statuses=["State Lease", "Customary (ILG)", "Unknown / TBC"]
+
+    # Draw every random column in one vectorized call each, then materialize dicts at the end
+    n=240; rng=np.random.default_rng(42); now=datetime.now(timezone.utc)
+    sub_i=rng.integers(0,len(suburbs),n); src_i=rng.integers(0,len(sources),n); type_i=rng.integers(0,len(types),n)
+    is_sale=rng.random(n) < 0.2
+    single=np.isin(type_i,[types.index("Studio"),types.index("Room")])
+    beds=np.where(single,1,rng.integers(1,6,n))
+    bases=np.array(BASES)[np.array([TIERS.get(s,3)-1 for s in suburbs])[sub_i]]
+    prices=np.where(is_sale,
+        rng.normal(bases*12*10,bases*12*2).astype(np.int64),
+        np.maximum(800,rng.normal(bases,bases*0.18).astype(np.int64)))
+    scraped_h=rng.integers(0,31,n)*24+rng.integers(0,25,n)
+    first_seen_h=scraped_h+rng.integers(0,15,n)*24
+    sqm=np.where(type_i==types.index("Room"),rng.integers(10,26,n),rng.integers(40,401,n))
+
+    is_fb=src_i==sources.index("Facebook Marketplace")
+    # Randomly verify some FB listings via the new landline registry logic
+    verified=~is_fb | (rng.random(n) < 0.15)
+    health=np.where(is_fb,rng.integers(40,96,n),rng.integers(85,101,n))
+    status_i=rng.integers(0,len(statuses),n); flag_roll=rng.random(n)
+    middleman=rng.random(n) < 0.2
+
+    cols=zip(sub_i.tolist(),src_i.tolist(),type_i.tolist(),is_sale.tolist(),beds.tolist(),prices.tolist(),
+        scraped_h.tolist(),first_seen_h.tolist(),sqm.tolist(),verified.tolist(),health.tolist(),
+        status_i.tolist(),flag_roll.tolist(),middleman.tolist())
+    out=[]
+    for i,(si,ri,ti,sale,beds_i,price,sh,fh,sq,ver,hl,st,roll,mid) in enumerate(cols):
+        suburb=suburbs[si]; ptype=types[ti]; t_status=statuses[st]
+        price_raw=f"K{price:,}" if sale else f"K{price:,}/month"
+        l_flags=[]
+        if t_status == "Unknown / TBC" and roll < 0.3: l_flags = ["Dispute"]
+        if t_status == "State Lease" and roll < 0.05: l_flags = ["Caveat"]
+        out.append({"listing_id":f"lst{i:04d}","source_site":sources[ri],"title":f"{beds_i} Bedroom {ptype} – {suburb}",
             "price_raw":price_raw,"price_monthly_k":price,"price_confidence":"high",
             "location":f"{suburb}, NCD","suburb":suburb,"listing_url":f"https://hausples.com.pg/listing/{i+1}",
-            "is_verified":is_verified,"property_type":ptype,"bedrooms":beds,
-            "sqm": sqm, "is_for_sale": is_sale, "health_score": health,
-            "is_middleman": rng.random() < 0.2, "group_id": None,
+            "is_verified":ver,"property_type":ptype,"bedrooms":beds_i,
+            "sqm": sq, "is_for_sale": sale, "health_score": hl,
+            "is_middleman": mid, "group_id": None,
             "title_status": t_status, "legal_flags": l_flags,
-            "scraped_at":scraped.isoformat(),"first_seen_at": first_seen.isoformat(),
-            "raw_text":f"{beds} bedroom {ptype.lower()} in {suburb} {price_raw}"})
-    return listings
+            "scraped_at":(now-timedelta(hours=sh)).isoformat(),"first_seen_at":(now-timedelta(hours=fh)).isoformat(),
+            "raw_text":f"{beds_i} bedroom {ptype.lower()} in {suburb} {price_raw}"})
+    return out
 
 def _market_score(price:int, suburb:str, first_seen_at:str=None)->dict:
-    avg = BENCHMARKS.get(suburb, 2800)
+    avg, lat, lng = _SUBURB_MARKET.get(suburb, _DEFAULT_MARKET)
     pct = round(((price - avg) / avg) * 100, 1)
 
     # Compute investment score
     try:
-        sub_coords = SUBURB_COORDS.get(suburb, {"lat": -9.44, "lng": 147.18})
         inv_score, inv_flags = calculate_investment_score(
-            price,
-            avg,
-            sub_coords["lat"],
-            sub_coords["lng"],
+            price, avg, lat, lng,
             first_seen_at or datetime.now(timezone.utc).isoformat()
         )
     except Exception as e:
         log.error(f"Investment scoring failed: {e}")
         inv_score, inv_flags = 0.0, []
 
-    result = {
+    label = _LABEL_DEAL if pct <= -15 else _LABEL_OVERPRICED if pct >= 15 else _LABEL_FAIR
+    return {
         "pct_vs_avg": pct,
         "benchmark_avg": avg,
         "investment_score": inv_score,
-        "investment_flags": inv_flags
+        "investment_flags": inv_flags,
+        **label,
     }
 
-    if pct <= -15:
-        result.update({"label": "Deal", "color": "#4ade80"})
-    elif pct >= 15:
-        result.update({"label": "Overpriced", "color": "#f87171"})
-    else:
-        result.update({"label": "Fair", "color": "#facc15"})
-
-    return result
-
 
 def _suburb_stats(listings):
     # Separate rent and sale
     rent_grouped = defaultdict(list)
     sale_grouped = defaultdict(list)
-    now = datetime.now(timezone.utc)
 
     for l in listings:
         sub = l.get("suburb")
@@ -390,50 +439,58 @@ def _suburb_stats(listings):
         else:
             rent_grouped[sub].append(l)
 
+    return _grouped_suburb_stats(rent_grouped, sale_grouped)
+
+def _avg_price_sqm(items) -> int:
+    pairs = [(l["price_monthly_k"], l["sqm"]) for l in items if l.get("price_monthly_k") and l.get("sqm")]
+    if not pairs: return 0
+    arr = np.array(pairs, dtype=np.float64)
+    return int((arr[:, 0] / arr[:, 1]).mean())
+
+def _parse_ts(value) -> Optional[float]:
+    try: dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError): return None
+    return dt.timestamp() if dt.tzinfo else None
+
+def _dom_span(l) -> Optional[tuple]:
+    # (first_seen, last_seen) epoch seconds for days-on-market; last_seen is None while still on the market
+    first = l.get("first_seen_at") or l.get("scraped_at")
+    f_ts = _parse_ts(first) if first else None
+    if f_ts is None: return None
+    if l.get("is_active", True) or not l.get("scraped_at"): return (f_ts, None)
+    l_ts = _parse_ts(l["scraped_at"])
+    return (f_ts, l_ts) if l_ts is not None else None
+
+def _grouped_suburb_stats(rent_grouped, sale_grouped, sub_spans=None):
+    now = datetime.now(timezone.utc)
     result = []
     for sub in set(list(rent_grouped.keys()) + list(sale_grouped.keys())):
         r_items = rent_grouped.get(sub, [])
         s_items = sale_grouped.get(sub, [])
 
-        r_prices = [l["price_monthly_k"] for l in r_items if l.get("price_monthly_k")]
-        s_prices = [l["price_monthly_k"] for l in s_items if l.get("price_monthly_k")] # This is total price for sale
+        r_prices = np.fromiter((l["price_monthly_k"] for l in r_items if l.get("price_monthly_k")), dtype=np.int64)
+        s_prices = np.fromiter((l["price_monthly_k"] for l in s_items if l.get("price_monthly_k")), dtype=np.int64) # This is total price for sale
 
-        n_rent = len(r_prices)
-        avg_rent = int(sum(r_prices)/n_rent) if n_rent else 0
+        n_rent = r_prices.size
+        avg_rent = int(r_prices.mean()) if n_rent else 0
 
         # Price per SQM (Separated)
-        rent_sqm_list = [l["price_monthly_k"]/l["sqm"] for l in r_items if l.get("price_monthly_k") and l.get("sqm")]
-        sale_sqm_list = [l["price_monthly_k"]/l["sqm"] for l in s_items if l.get("price_monthly_k") and l.get("sqm")]
-
-        avg_rent_sqm = int(sum(rent_sqm_list)/len(rent_sqm_list)) if rent_sqm_list else 0
-        avg_sale_sqm = int(sum(sale_sqm_list)/len(sale_sqm_list)) if sale_sqm_list else 0
+        avg_rent_sqm = _avg_price_sqm(r_items)
+        avg_sale_sqm = _avg_price_sqm(s_items)
 
         # Absorption Rate (Days on Market)
         # For active listings, DOM = (now - first_seen)
         # For inactive listings, DOM = (last_seen - first_seen)
-        doms = []
-        for l in (r_items + s_items):
-            first = l.get("first_seen_at") or l.get("scraped_at")
-            last = l.get("scraped_at")
-            if first:
-                try:
-                    f_dt = datetime.fromisoformat(first.replace('Z', '+00:00'))
-                    if l.get("is_active", True):
-                        days = (now - f_dt).days
-                    elif last:
-                        l_dt = datetime.fromisoformat(last.replace('Z', '+00:00'))
-                        days = (l_dt - f_dt).days
-                    else:
-                        days = (now - f_dt).days
-                    doms.append(max(1, days))
-                except: pass
+        now_ts = now.timestamp()
+        spans = sub_spans[sub] if sub_spans is not None else [_dom_span(l) for l in (r_items + s_items)]
+        doms = [max(1, int(((end if end is not None else now_ts) - first) // 86400)) for first, end in filter(None, spans)]
 
         avg_dom = round(sum(doms)/len(doms), 1) if doms else 0
 
         # Rental Yield
         # Rule of thumb for PNG: Annual Rent / Sale Price
         # If no sale data, use benchmark sale prices derived from rent benchmarks (Cap Rate ~8-12%)
-        avg_sale = int(sum(s_prices)/len(s_prices)) if s_prices else (BENCHMARKS.get(sub, 2500) * 12 * 10)
+        avg_sale = int(s_prices.mean()) if s_prices.size else (BENCHMARKS.get(sub, 2500) * 12 * 10)
         yield_pct = round(((avg_rent * 12) / avg_sale) * 100, 2) if avg_sale > 0 else 0
 
         # Relative Performance Index
@@ -446,9 +503,10 @@ def _suburb_stats(listings):
         result.append({
             "suburb": sub,
             "avg_price": avg_rent,
-            "median_price": int(sorted(r_prices)[n_rent//2]) if n_rent else 0,
-            "min_price": min(r_prices) if n_rent else 0,
-            "max_price": max(r_prices) if n_rent else 0,
+            # Upper median via O(n) partition instead of a full sort
+            "median_price": int(np.partition(r_prices, n_rent//2)[n_rent//2]) if n_rent else 0,
+            "min_price": int(r_prices.min()) if n_rent else 0,
+            "max_price": int(r_prices.max()) if n_rent else 0,
             "avg_price_sqm": avg_sale_sqm or (avg_rent_sqm * 100), # Fallback: Cap Rate based estimate for heatmap
             "avg_rent_sqm": avg_rent_sqm,
             "avg_sale_sqm": avg_sale_sqm,
@@ -463,15 +521,35 @@ def _suburb_stats(listings):
 
     return sorted(result, key=lambda x: -x["avg_price"])
 
-def _trends(listings):
+def _trend_noise(suburb: str, week: int) -> float:
+    # Stable across requests and workers (unlike hash()), in the range [0.93, 1.07]
+    return 0.93 + (zlib.crc32(f"{suburb}:{week}".encode()) & 0xFF) / 255 * 0.14
+
+def _build_suburb_timeline(listings):
+    # suburb -> (scraped_at epochs ascending, rents in the same order)
+    points = defaultdict(list)
+    for l in listings:
+        if not (l.get("suburb") and l.get("price_monthly_k")): continue
+        ts = _parse_ts(l.get("scraped_at"))
+        if ts is not None: points[l["suburb"]].append((ts, l["price_monthly_k"]))
+    timeline = {}
+    for sub, pts in points.items():
+        pts.sort()
+        timeline[sub] = ([t for t, _ in pts], [p for _, p in pts])
+    return timeline
+
+def _history_mtime() -> int:
+    try: return HISTORY_FILE.stat().st_mtime_ns
+    except FileNotFoundError: return 0
+
+def _trends(listings, timeline=None):
     top = ["Waigani", "Boroko", "Gerehu"]
     now = datetime.now(timezone.utc)
 
     # Try to load real history first
     if HISTORY_FILE.exists():
         try:
-            with open(HISTORY_FILE) as f:
-                history = json.load(f)
+            history = orjson.loads(HISTORY_FILE.read_bytes())
 
             if len(history) >= 2:
                 rows = []
@@ -486,15 +564,222 @@ def _trends(listings):
             log.warning(f"Failed to use history for trends: {e}")
 
     # Fallback to simulated trends if history is too sparse
-    rng = random.Random(99); rows = []
+    # Suburb averages don't change between weeks, so compute them once rather than per week
+    sub_prices = defaultdict(list)
+    for l in listings:
+        if l.get("suburb") in top and l.get("price_monthly_k"): sub_prices[l["suburb"]].append(l["price_monthly_k"])
+    avgs = {sub: sum(p) / len(p) for sub, p in sub_prices.items()}
+
+    # Weeks with scraped listings use their real average, found by bisecting each suburb's sorted
+    # timeline; empty weeks fall back to the overall average with a little noise.
+    if timeline is None: timeline = _derived(listings, "suburb_timeline", _build_suburb_timeline)
+    now_ts = now.timestamp(); week_s = 7 * 86400
+    rows = []
     for w in range(7, -1, -1):
         row = {"week": (now - timedelta(weeks=w)).strftime("%b %d")}
         for sub in top:
-            all_p = [l["price_monthly_k"] for l in listings if l.get("suburb") == sub and l.get("price_monthly_k")]
-            row[sub] = int((sum(all_p) / len(all_p)) * rng.uniform(0.93, 1.07)) if all_p else BENCHMARKS.get(sub, 2500)
+            ts, prices = timeline.get(sub, ((), ()))
+            lo = bisect_left(ts, now_ts - (w + 1) * week_s); hi = bisect_left(ts, now_ts - w * week_s)
+            if hi > lo: row[sub] = int(statistics.fmean(prices[lo:hi]))
+            elif sub in avgs: row[sub] = int(avgs[sub] * _trend_noise(sub, w))
+            else: row[sub] = BENCHMARKS.get(sub, 2500)
         rows.append(row)
     return rows
 
+# Data derived from the cached listings list lives here until _load_listings() hands out a new list
+_derived_cache: dict = {"listings": None, "entries": {}}
+
+def _derived_entries(listings) -> dict:
+    # The cache is unlocked: only touch it from the event loop (or sync callers)
+    if _derived_cache["listings"] is not listings:
+        _derived_cache["entries"] = {}
+        _derived_cache["listings"] = listings
+    return _derived_cache["entries"]
+
+def _derived(listings, name, build, stamp=None):
+    entries = _derived_entries(listings)
+    hit = entries.get(name)
+    if hit is None or hit[0] != stamp:
+        hit = entries[name] = (stamp, build(listings))
+    return hit[1]
+
+async def _derived_async(listings, name, build, stamp=None):
+    """_derived for blocking builds: lookup and store on the loop, only build() in a worker thread."""
+    entries = _derived_entries(listings)
+    hit = entries.get(name)
+    if hit is None or hit[0] != stamp:
+        # entries belongs to this listings list even if the cache moves on meanwhile
+        hit = entries[name] = (stamp, await asyncio.to_thread(build, listings))
+    return hit[1]
+
+def _build_analytics(listings):
+    # Single pass feeding overview, heatmap, supply-demand and sources
+    verified = flags = 0
+    prices = []; last_scraped = None
+    sources = set(); source_counts = defaultdict(int)
+    by_suburb = defaultdict(list); rent_grouped = defaultdict(list); sale_grouped = defaultdict(list)
+    # Timestamps are parsed once per data version, not on every hourly rebuild
+    spans = _derived(listings, "dom_spans", lambda ls: [_dom_span(l) for l in ls]); sub_spans = defaultdict(list)
+
+    for i, l in enumerate(listings):
+        price = l.get("price_monthly_k"); sub = l.get("suburb")
+        if l.get("is_verified"): verified += 1
+        if price: prices.append(price)
+        scraped = l.get("scraped_at", "")
+        if last_scraped is None or scraped > last_scraped: last_scraped = scraped
+        sources.add(l.get("source_site")); source_counts[l.get("source_site", "Unknown")] += 1
+        if not sub: continue
+        by_suburb[sub].append(l); sub_spans[sub].append(spans[i])
+        (sale_grouped if l.get("is_for_sale") else rent_grouped)[sub].append(l)
+        if price:
+            avg = BENCHMARKS.get(sub, 2800)
+            if round(((price - avg) / avg) * 100, 1) >= 40: flags += 1
+
+    # Upper median by O(n) selection rather than sorting a copy of every price
+    prices = np.array(prices, dtype=np.int64); mid = prices.size // 2
+    overview = {"total_listings":len(listings),"verified_listings":verified,
+        "avg_rent_pgk":int(prices.mean()) if prices.size else 0,
+        "median_rent_pgk":int(np.partition(prices, mid)[mid]) if prices.size else 0,"middleman_flags":flags,
+        "sources_active":len(sources),
+        "suburbs_tracked":len(by_suburb),
+        "last_scraped":last_scraped if last_scraped is not None else "Never"}
+
+    rng = random.Random(7); supply = []
+    for suburb, items in by_suburb.items():
+        sub_prices = [l["price_monthly_k"] for l in items if l.get("price_monthly_k")]
+        n_verified = sum(1 for l in items if l.get("is_verified"))
+        supply.append({"suburb":suburb,"supply":len(items),
+            "verified_supply":n_verified,
+            "unverified_supply":len(items) - n_verified,
+            "avg_price":int(sum(sub_prices)/len(sub_prices)) if sub_prices else 0,
+            "demand_score":min(100,40+n_verified*3+rng.randint(0,15))})
+
+    return {
+        "overview": overview,
+        "heatmap": _grouped_suburb_stats(rent_grouped, sale_grouped, sub_spans),
+        "supply_demand": sorted(supply, key=lambda x: -x["supply"]),
+        "sources": [{"name":k,"count":v} for k,v in sorted(source_counts.items(),key=lambda x:-x[1])],
+    }
+
+def _build_listing_index(listings):
+    # Inverted indexes (lowercased keys -> listing positions) for the /api/listings filters
+    idx = {k: defaultdict(list) for k in ("suburb", "source", "type", "verified", "title_status", "legal_flags")}
+    for i, l in enumerate(listings):
+        idx["suburb"][(l.get("suburb") or "").lower()].append(i)
+        idx["source"][(l.get("source_site") or "").lower()].append(i)
+        idx["type"][(l.get("property_type") or "").lower()].append(i)
+        idx["verified"][l.get("is_verified")].append(i)
+        idx["title_status"][(l.get("title_status") or "").lower()].append(i)
+        for f in set(f.lower() for f in (l.get("legal_flags") or [])): idx["legal_flags"][f].append(i)
+    by_price = sorted(range(len(listings)), key=lambda i: listings[i].get("price_monthly_k") or 0)
+    idx["price_ids"] = by_price
+    idx["price_keys"] = [listings[i].get("price_monthly_k") or 0 for i in by_price]
+    return idx
+
+def _ids_containing(index, needle):
+    # Substring filters only need to scan the distinct keys, not every listing
+    return [i for key, ids in index.items() if needle in key for i in ids]
+
+def _build_market_values(listings):
+    return [_market_score(l["price_monthly_k"],l["suburb"],l.get("first_seen_at")) if l.get("price_monthly_k") and l.get("suburb") else None
+        for l in listings]
+
+def _market_values(listings) -> list:
+    # One score per listing position; the investment score's days-on-market term moves daily
+    return _derived(listings, "market_values", _build_market_values, stamp=datetime.now(timezone.utc).date())
+
+def _analytics_snapshot(listings) -> dict:
+    # Days-on-market in the heatmap depends on "now", so the snapshot is also refreshed hourly
+    hour = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H")
+    return _derived(listings, "analytics", _build_analytics, stamp=hour)
+
+# ── Typed response models (serialized by pydantic-core instead of jsonable_encoder) ──
+
+# Listing rows come from scraper JSON, Mongo and legacy files, so every field but the id is
+# lenient: a null or a float where an int is usual must not fail a whole page.
+Num = Union[int, float]
+
+class MarketValueOut(BaseModel):
+    pct_vs_avg: Optional[Num] = None
+    benchmark_avg: Optional[Num] = None
+    investment_score: Optional[Num] = None
+    investment_flags: Optional[List[str]] = []
+    label: Optional[str] = None
+    color: Optional[str] = None
+
+class ListingOut(BaseModel):
+    listing_id: str
+    source_site: Optional[str] = None
+    title: Optional[str] = None
+    price_raw: Optional[str] = ""
+    price_monthly_k: Optional[Num] = None
+    price_confidence: Optional[str] = "medium"
+    location: Optional[str] = ""
+    suburb: Optional[str] = None
+    listing_url: Optional[str] = ""
+    is_verified: Optional[bool] = False
+    scraped_at: Optional[str] = ""
+    first_seen_at: Optional[str] = ""
+    property_type: Optional[str] = None
+    bedrooms: Optional[Num] = None
+    sqm: Optional[Num] = None
+    is_for_sale: Optional[bool] = False
+    is_active: Optional[bool] = True
+    health_score: Optional[Num] = 0
+    is_middleman: Optional[bool] = False
+    title_status: Optional[str] = "Unknown / TBC"
+    legal_flags: Optional[List[str]] = []
+    group_id: Optional[str] = None
+    investment_score: Optional[Num] = 0.0
+    investment_flags: Optional[List[str]] = []
+    raw_text: Optional[str] = ""
+    market_value: Optional[MarketValueOut] = None
+
+class ListingsPageOut(BaseModel):
+    total: int
+    page: int
+    pages: int
+    limit: int
+    listings: List[ListingOut]
+
+# The streamed /api/listings path bypasses response_model, so it validates rows through this
+_LISTINGS_OUT = TypeAdapter(List[ListingOut])
+
+class OverviewOut(BaseModel):
+    total_listings: int
+    verified_listings: int
+    avg_rent_pgk: int
+    median_rent_pgk: int
+    middleman_flags: int
+    sources_active: int
+    suburbs_tracked: int
+    last_scraped: str
+
+class SuburbStatOut(BaseModel):
+    suburb: str
+    avg_price: int
+    median_price: int
+    min_price: int
+    max_price: int
+    avg_price_sqm: int
+    avg_rent_sqm: int
+    avg_sale_sqm: int
+    rental_yield: float
+    absorption_rate: float
+    speed_index_pct: int
+    listings: int
+    rent_count: int
+    sale_count: int
+    lat: float
+    lng: float
+
+class HeatmapOut(BaseModel):
+    suburbs: List[SuburbStatOut]
+
+class MiddlemanFlagsOut(BaseModel):
+    flagged: List[ListingOut]
+    total_flagged: int
+
 class ScrapeRequest(BaseModel):
     sources: List[str] = ["hausples","professionals","agencies"]
     max_pages: int = 3
@@ -536,35 +821,92 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         raise credentials_exception
     return user
 
-async def _run_scrape(job_id:str, req:ScrapeRequest):
+_redis_client = None
+_pending_job_saves: set = set()
+
+def _get_redis():
+    global _redis_client
+    if not REDIS_URL: return None
+    if _redis_client is None:
+        import redis.asyncio as aioredis
+        _redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    return _redis_client
+
+async def _save_job(job: dict, new: bool = False):
+    r = _get_redis()
+    if r is None:
+        if new and len(scrape_jobs) >= MAX_LOCAL_JOBS: scrape_jobs.popitem(last=False)
+        scrape_jobs[job["job_id"]] = job
+        return
+    try:
+        # Jobs are shared across workers and expire on their own after JOB_TTL_SECONDS
+        await r.set(f"job:{job['job_id']}", orjson.dumps(job), ex=JOB_TTL_SECONDS)
+        if new:
+            now = datetime.now(timezone.utc).timestamp()
+            await r.zadd("jobs", {job["job_id"]: now})
+            await r.zremrangebyscore("jobs", "-inf", now - JOB_TTL_SECONDS)
+    except Exception as e:
+        log.warning(f"Redis job save failed: {e}")
+
+def _save_job_soon(job: dict):
+    # For sync progress callbacks running inside the event loop
+    task = asyncio.get_running_loop().create_task(_save_job(job))
+    _pending_job_saves.add(task)
+    task.add_done_callback(_pending_job_saves.discard)
+
+async def _get_job(job_id: str) -> Optional[dict]:
+    r = _get_redis()
+    if r is None: return scrape_jobs.get(job_id)
+    try:
+        raw = await r.get(f"job:{job_id}")
+    except Exception as e:
+        log.warning(f"Redis job lookup failed: {e}")
+        return None
+    return orjson.loads(raw) if raw else None
+
+async def _recent_jobs(n: int = 20) -> list[dict]:
+    r = _get_redis()
+    if r is None: return list(islice(reversed(scrape_jobs.values()), n)) # Insertion order is queue order
+    try:
+        ids = await r.zrevrange("jobs", 0, n - 1)
+        raw = await r.mget([f"job:{i}" for i in ids]) if ids else []
+    except Exception as e:
+        log.warning(f"Redis job listing failed: {e}")
+        return []
+    return [orjson.loads(j) for j in raw if j]
+
+async def _run_scrape(job:dict, req:ScrapeRequest):
+    job_id = job["job_id"]
     from png_scraper.main import run_all, export_json
+    from png_scraper.engine import migrate_legacy_id
     from png_scraper.notifier import detect_price_drops, match_saved_searches, notify_price_drop, notify_new_match
 
     # Load old listings for persistence and trend analysis
     old_listings = []
     if OUTPUT_FILE.exists():
         try:
-            with open(OUTPUT_FILE) as f: old_listings = json.load(f)
+            old_listings = orjson.loads(OUTPUT_FILE.read_bytes())
         except: pass
 
-    old_map = {l["listing_id"]: l for l in old_listings}
+    # Listings saved before the BLAKE2b switch get their new id so first_seen_at carries over
+    old_map = {migrate_legacy_id(l)["listing_id"]: l for l in old_listings}
 
-    scrape_jobs[job_id].update({
+    job.update({
         "status": "running",
         "started_at": datetime.now(timezone.utc).isoformat(),
         "progress": 5,
         "collected": 0,
         "current_source": "Initializing"
     })
+    await _save_job(job)
 
     def on_progress(source_name, count, progress_pct):
-        if job_id in scrape_jobs:
-            current_total = scrape_jobs[job_id].get("collected", 0)
-            scrape_jobs[job_id].update({
-                "collected": current_total + count,
-                "progress": round(5 + (progress_pct * 0.9)),
-                "current_source": source_name
-            })
+        job.update({
+            "collected": job.get("collected", 0) + count,
+            "progress": round(5 + (progress_pct * 0.9)),
+            "current_source": source_name
+        })
+        _save_job_soon(job)
 
     try:
         include_fb = req.include_facebook or any(s.lower() == "facebook" for s in req.sources)
@@ -574,6 +916,7 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
             headless=req.headless,
             sources=req.sources,
             max_pages=req.max_pages,
+            agency_concurrency=SCRAPE_CONCURRENCY,
             on_progress=on_progress
         )
 
@@ -581,10 +924,11 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
             now_str = datetime.now(timezone.utc).isoformat()
             merged = []
             seen_in_this_run = set()
+            # Convert once; merge, price-drop and saved-search passes share these dicts
+            new_dicts = [r.to_dict() for r in new_results]
 
             # Update or Add new listings
-            for l_obj in new_results:
-                l = l_obj.to_dict()
+            for l in new_dicts:
                 lid = l["listing_id"]
                 seen_in_this_run.add(lid)
 
@@ -624,7 +968,7 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
                 history = []
                 if HISTORY_FILE.exists():
                     try:
-                        with open(HISTORY_FILE) as f: history = json.load(f)
+                        history = orjson.loads(HISTORY_FILE.read_bytes())
                     except: pass
 
                 # Deduplicate by date (one snapshot per day max)
@@ -634,12 +978,12 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
 
                 # Keep last 12 snapshots (roughly 3 months of weekly or 12 days of daily)
                 history = history[-12:]
-                with open(HISTORY_FILE, "w") as f: json.dump(history, f, indent=2)
+                HISTORY_FILE.write_bytes(orjson.dumps(history, option=orjson.OPT_INDENT_2))
             except Exception as e:
                 log.error(f"Failed to save historical snapshot: {e}")
 
             # --- NOTIFICATIONS ---
-            drops = detect_price_drops(old_listings, [r.to_dict() for r in new_results])
+            drops = detect_price_drops(old_listings, new_dicts)
             for drop in drops:
                 admin_phone = "+675 7000 0000"
                 notify_price_drop(admin_phone, drop)
@@ -649,7 +993,7 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
                 for s in u.saved_searches:
                     all_saved.append({"user_id": u.email or u.phone, "phone": u.phone, "name": s["name"], "criteria": s["criteria"]})
 
-            matches = match_saved_searches([r.to_dict() for r in new_results], all_saved)
+            matches = match_saved_searches(new_dicts, all_saved)
             for match in matches:
                 if match["phone"]:
                     notify_new_match(match["phone"], match["search_name"], match["listing"])
@@ -657,7 +1001,7 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
         else:
             log.warning(f"Scrape job {job_id} collected 0 listings.")
 
-        scrape_jobs[job_id].update({
+        job.update({
             "status": "complete",
             "finished_at": datetime.now(timezone.utc).isoformat(),
             "progress": 100,
@@ -666,7 +1010,8 @@ async def _run_scrape(job_id:str, req:ScrapeRequest):
         })
     except Exception as e:
         log.error(f"Scrape job {job_id} failed: {e}")
-        scrape_jobs[job_id].update({"status":"error","error":str(e)})
+        job.update({"status":"error","error":str(e)})
+    await _save_job(job)
 
 # ── Routes ────────────────────────────────────────────────────────────────────
 
@@ -760,88 +1105,105 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         }
     }
 
-@app.get("/api/listings")
-def get_listings(suburb:Optional[str]=None,source:Optional[str]=None,type:Optional[str]=None,
+LISTINGS_MAX_LIMIT = 500
+LISTINGS_STREAM_THRESHOLD = 100 # Larger pages are streamed in chunks instead of buffered
+STREAM_CHUNK_ROWS = 50
+
+async def _stream_listings_page(head: dict, rows: list[dict]):
+    yield orjson.dumps(head)[:-1] + b',"listings":['
+    for i in range(0, len(rows), STREAM_CHUNK_ROWS):
+        chunk = _LISTINGS_OUT.validate_python(rows[i:i + STREAM_CHUNK_ROWS])
+        # Strip the chunk's own brackets and join chunks with commas
+        yield (b"," if i else b"") + _LISTINGS_OUT.dump_json(chunk)[1:-1]
+    yield b"]}"
+
+@app.get("/api/listings", response_model=ListingsPageOut)
+async def get_listings(suburb:Optional[str]=None,source:Optional[str]=None,type:Optional[str]=None,
     min_price:Optional[int]=None,max_price:Optional[int]=None,verified:Optional[bool]=None,
     title_status:Optional[str]=None, legal_flags:Optional[str]=None,
     sort:str="scraped_at",order:str="desc",page:int=1,limit:int=25,
     current_user: User = Depends(get_current_user)):
-    ls=_load_listings()
-    if suburb: ls=[l for l in ls if (l.get("suburb") or "").lower()==suburb.lower()]
-    if source: ls=[l for l in ls if source.lower() in (l.get("source_site") or "").lower()]
-    if type:   ls=[l for l in ls if (l.get("property_type") or "").lower()==type.lower()]
-    if min_price: ls=[l for l in ls if (l.get("price_monthly_k") or 0)>=min_price]
-    if max_price: ls=[l for l in ls if (l.get("price_monthly_k") or 0)<=max_price]
-    if verified is not None: ls=[l for l in ls if l.get("is_verified")==verified]
-    if title_status: ls=[l for l in ls if title_status.lower() in (l.get("title_status") or "").lower()]
-    if legal_flags: ls=[l for l in ls if any(legal_flags.lower() in f.lower() for f in (l.get("legal_flags") or []))]
-
-    for l in ls:
-        if l.get("price_monthly_k") and l.get("suburb"): l["market_value"]=_market_score(l["price_monthly_k"],l["suburb"],l.get("first_seen_at"))
-    try: ls.sort(key=lambda x:x.get(sort) or "",reverse=(order=="desc"))
+    limit=max(1,min(limit,LISTINGS_MAX_LIMIT))
+    all_ls=await _load_listings_async(); idx=_derived(all_ls, "index", _build_listing_index); matches=[]
+    if suburb: matches.append(idx["suburb"].get(suburb.lower(), ()))
+    if source: matches.append(_ids_containing(idx["source"], source.lower()))
+    if type:   matches.append(idx["type"].get(type.lower(), ()))
+    if min_price or max_price:
+        lo=bisect_left(idx["price_keys"],min_price) if min_price else 0
+        hi=bisect_right(idx["price_keys"],max_price) if max_price else len(all_ls)
+        matches.append(idx["price_ids"][lo:hi])
+    if verified is not None: matches.append(idx["verified"].get(verified, ()))
+    if title_status: matches.append(_ids_containing(idx["title_status"], title_status.lower()))
+    if legal_flags: matches.append(_ids_containing(idx["legal_flags"], legal_flags.lower()))
+    ids=sorted(set(matches[0]).intersection(*matches[1:])) if matches else list(range(len(all_ls)))
+
+    try: ids.sort(key=lambda i:all_ls[i].get(sort) or "",reverse=(order=="desc"))
     except: pass
-    total=len(ls); offset=(page-1)*limit
-    return {"total":total,"page":page,"pages":max(1,(total+limit-1)//limit),"limit":limit,"listings":ls[offset:offset+limit]}
-
-@app.get("/api/analytics/overview")
-def get_overview(current_user: User = Depends(get_current_user)):
-    ls=_load_listings(); prices=[l["price_monthly_k"] for l in ls if l.get("price_monthly_k")]
-    flags=sum(1 for l in ls if l.get("price_monthly_k") and l.get("suburb") and _market_score(l["price_monthly_k"],l["suburb"],l.get("first_seen_at"))["pct_vs_avg"]>=40)
-    return {"total_listings":len(ls),"verified_listings":sum(1 for l in ls if l.get("is_verified")),
-        "avg_rent_pgk":int(sum(prices)/len(prices)) if prices else 0,
-        "median_rent_pgk":sorted(prices)[len(prices)//2] if prices else 0,"middleman_flags":flags,
-        "sources_active":len(set(l.get("source_site") for l in ls)),
-        "suburbs_tracked":len(set(l.get("suburb") for l in ls if l.get("suburb"))),
-        "last_scraped":max((l.get("scraped_at","") for l in ls),default="Never")}
-
-@app.get("/api/analytics/heatmap")
-def get_heatmap(current_user: User = Depends(get_current_user)): return {"suburbs":_suburb_stats(_load_listings())}
+    total=len(ids); offset=(page-1)*limit
+    # Scores are attached to per-response copies; the cached listing dicts are never mutated
+    mvs=_market_values(all_ls)
+    rows=[{**all_ls[i],"market_value":mvs[i]} for i in ids[offset:offset+limit]]
+    head={"total":total,"page":page,"pages":max(1,(total+limit-1)//limit),"limit":limit}
+    if limit>LISTINGS_STREAM_THRESHOLD:
+        return StreamingResponse(_stream_listings_page(head,rows),media_type="application/json")
+    return {**head,"listings":rows}
+
+class NotModified(Exception):
+    pass
+
+@app.exception_handler(NotModified)
+async def _not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.args[0]})
+
+def analytics_etag(request: Request, response: Response) -> str:
+    """Weak ETag for analytics payloads; they only change with the data files or the clock hour."""
+    etag = f'W/"{_output_mtime()}-{_history_mtime()}-{datetime.now(timezone.utc).strftime("%Y%m%d%H")}"'
+    if request.headers.get("if-none-match") == etag:
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
+    return etag
+
+@app.get("/api/analytics/overview", response_model=OverviewOut)
+async def get_overview(current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)): return _analytics_snapshot(await _load_listings_async())["overview"]
+
+@app.get("/api/analytics/heatmap", response_model=HeatmapOut)
+async def get_heatmap(current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)): return {"suburbs":_analytics_snapshot(await _load_listings_async())["heatmap"]}
 
 @app.get("/api/analytics/trends")
-def get_trends(current_user: User = Depends(get_current_user)): return {"trends":_trends(_load_listings())}
+async def get_trends(current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)):
+    # Trends only change with the data, the history file or the calendar week labels.
+    # A rebuild reads the history file from disk, so it runs in a worker thread; the
+    # _derived cache (including the suburb timeline) is only touched here on the loop.
+    stamp = (_history_mtime(), datetime.now(timezone.utc).date())
+    listings = await _load_listings_async()
+    timeline = _derived(listings, "suburb_timeline", _build_suburb_timeline)
+    return {"trends":await _derived_async(listings, "trends", lambda ls: _trends(ls, timeline), stamp)}
 
 @app.get("/api/analytics/supply-demand")
-def get_supply_demand(current_user: User = Depends(get_current_user)):
-    grouped=defaultdict(list); rng=random.Random(7)
-    for l in _load_listings():
-        if l.get("suburb"): grouped[l["suburb"]].append(l)
-    result=[]
-    for suburb,items in grouped.items():
-        prices=[l["price_monthly_k"] for l in items if l.get("price_monthly_k")]
-        result.append({"suburb":suburb,"supply":len(items),
-            "verified_supply":sum(1 for l in items if l.get("is_verified")),
-            "unverified_supply":sum(1 for l in items if not l.get("is_verified")),
-            "avg_price":int(sum(prices)/len(prices)) if prices else 0,
-            "demand_score":min(100,40+sum(1 for l in items if l.get("is_verified"))*3+rng.randint(0,15))})
-    return {"data":sorted(result,key=lambda x:-x["supply"])}
+async def get_supply_demand(current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)): return {"data":_analytics_snapshot(await _load_listings_async())["supply_demand"]}
 
 @app.get("/api/analytics/sources")
-def get_sources_analytics(current_user: User = Depends(get_current_user)):
-    counts=defaultdict(int)
-    for l in _load_listings(): counts[l.get("source_site","Unknown")]+=1
-    return {"sources":[{"name":k,"count":v} for k,v in sorted(counts.items(),key=lambda x:-x[1])]}
-
-@app.get("/api/analytics/middleman-flags")
-def get_middleman_flags(limit:int=20, current_user: User = Depends(get_current_user)):
-    flagged=[]
-    for l in _load_listings():
-        if l.get("price_monthly_k") and l.get("suburb"):
-            s=_market_score(l["price_monthly_k"],l["suburb"],l.get("first_seen_at"))
-            if s["pct_vs_avg"]>=40: flagged.append({**l,"market_value":s})
-    flagged.sort(key=lambda x:x["market_value"]["pct_vs_avg"],reverse=True)
-    return {"flagged":flagged[:limit],"total_flagged":len(flagged)}
+async def get_sources_analytics(current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)): return {"sources":_analytics_snapshot(await _load_listings_async())["sources"]}
+
+@app.get("/api/analytics/middleman-flags", response_model=MiddlemanFlagsOut)
+async def get_middleman_flags(limit:int=20, current_user: User = Depends(get_current_user), _etag: str = Depends(analytics_etag)):
+    ls=await _load_listings_async(); mvs=_market_values(ls)
+    flagged=[i for i,mv in enumerate(mvs) if mv and mv["pct_vs_avg"]>=40]
+    flagged.sort(key=lambda i:mvs[i]["pct_vs_avg"],reverse=True)
+    return {"flagged":[{**ls[i],"market_value":mvs[i]} for i in flagged[:limit]],"total_flagged":len(flagged)}
 
 @app.post("/api/scrape/trigger")
 async def trigger_scrape(req:ScrapeRequest,background_tasks:BackgroundTasks,current_user: User = Depends(get_current_user)):
     job_id=str(uuid.uuid4())[:8]
-    scrape_jobs[job_id]={"job_id":job_id,"status":"queued","sources":req.sources,
+    job={"job_id":job_id,"status":"queued","sources":req.sources,
         "max_pages":req.max_pages,"queued_at":datetime.now(timezone.utc).isoformat(),"progress":0,"collected":0}
-    background_tasks.add_task(_run_scrape,job_id,req)
-    return scrape_jobs[job_id]
+    await _save_job(job, new=True)
+    background_tasks.add_task(_run_scrape,job,req)
+    return job
 
 @app.get("/api/scrape/status/{job_id}")
-def get_scrape_status(job_id:str, current_user: User = Depends(get_current_user)):
-    job=scrape_jobs.get(job_id)
+async def get_scrape_status(job_id:str, current_user: User = Depends(get_current_user)):
+    job=await _get_job(job_id)
     if not job: raise HTTPException(404,f"Job '{job_id}' not found")
     return job
 
@@ -851,7 +1213,7 @@ def clear_scrape_data(current_user: User = Depends(get_current_user)):
     try:
         if OUTPUT_FILE.exists(): OUTPUT_FILE.unlink()
         if HISTORY_FILE.exists(): HISTORY_FILE.unlink()
-        _listings_cache["timestamp"] = 0
+        _listings_cache["mtime"] = None
         _listings_cache["data"] = []
         # Also clear MongoDB if connected
         db = _get_db()
@@ -862,10 +1224,10 @@ def clear_scrape_data(current_user: User = Depends(get_current_user)):
         raise HTTPException(500, f"Failed to clear data: {e}")
 
 @app.get("/api/scrape/jobs")
-def list_jobs(current_user: User = Depends(get_current_user)): return {"jobs":sorted(scrape_jobs.values(),key=lambda x:x.get("queued_at",""),reverse=True)[:20]}
+async def list_jobs(current_user: User = Depends(get_current_user)): return {"jobs":await _recent_jobs(20)}
 
 @app.get("/api/suburbs")
-def get_suburbs(current_user: User = Depends(get_current_user)): return {"suburbs":[{"name":k,"lat":v["lat"],"lng":v["lng"]} for k,v in SUBURB_COORDS.items()]}
+def get_suburbs(current_user: User = Depends(get_current_user)): return _SUBURBS_PAYLOAD
 
 @app.post("/api/developer/keys")
 def generate_api_key(current_user: User = Depends(check_role("developer"))):
@@ -928,14 +1290,7 @@ def developer_listing_export(api_key: str):
     }
 
 @app.get("/api/sources")
-def get_source_list(current_user: User = Depends(get_current_user)):
-    return {"sources":[
-        "Hausples", "PNG Real Estate", "Marketmeri.com (Real Estate Section)", "PNG Buy n Rent",
-        "LJ Hookers", "Ray White PNG", "Strickland Real Estate", "The Professionals",
-        "Century 21 Siule Real Estate", "Budget Real Estate", "Arthur Strachan", "DAC Real Estate",
-        "Kenmok Real Estate", "Pacific Palms Property", "Credit Corporation Properties", "Nambawan Super (Property)", "AAA Properties",
-        "Edai Town Estate", "Tuhava", "Facebook Marketplace"
-    ]}
+def get_source_list(current_user: User = Depends(get_current_user)): return _SOURCES_PAYLOAD
 
 # ── Notifications & Saved Searches ───────────────────────────────────────────
 
@@ -14,8 +14,11 @@ def get_competitor_alerts(listings: List[Dict], agent_name: str) -> List[Dict]:
     but priced lower (Competitor Pricing Alerts).
     """
     alerts = []
-    my_listings = [l for l in listings if agent_name.lower() in (l.get("source_site") or "").lower()]
-    others = [l for l in listings if agent_name.lower() not in (l.get("source_site") or "").lower()]
+    # Single pass: lowercase the agent key once and each source once
+    agent_key = agent_name.lower()
+    my_listings, others = [], []
+    for l in listings:
+        (my_listings if agent_key in (l.get("source_site") or "").lower() else others).append(l)
 
     for mine in my_listings:
         sub = mine.get("suburb")
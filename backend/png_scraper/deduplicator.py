@@ -46,17 +46,18 @@ def group_listings(listings: List[Listing]) -> List[Listing]:
     listing appears as the primary representative if needed.
     """
     groups: Dict[str, List[Listing]] = {}
+    ungrouped: List[Listing] = []
 
+    # One pass buckets every listing, setting aside the ones without a fuzzy key
     for lst in listings:
         key = calculate_fuzzy_key(lst)
         if not key:
+            ungrouped.append(lst)
             continue
-
-        if key not in groups:
-            groups[key] = []
-        groups[key].append(lst)
+        groups.setdefault(key, []).append(lst)
 
     processed: List[Listing] = []
+    grouped_ids = set()
 
     for key, items in groups.items():
         # If group has more than 1 item, it's a suspected duplicate
@@ -65,17 +66,15 @@ def group_listings(listings: List[Listing]) -> List[Listing]:
         # Sort items in group: Verified first, then by health_score desc
         items.sort(key=lambda x: (x.is_verified, x.health_score), reverse=True)
 
-        for i, item in enumerate(items):
+        for item in items:
             item.group_id = group_id
+            grouped_ids.add(item.listing_id)
             # We can also attach meta-info about the group to the primary item
             # or to all items for the UI to consume.
             processed.append(item)
 
     # Add back listings that weren't grouped (if any, though calculate_fuzzy_key usually returns something)
-    grouped_ids = {l.listing_id for l in processed}
-    for l in listings:
-        if l.listing_id not in grouped_ids:
-            processed.append(l)
+    processed.extend(l for l in ungrouped if l.listing_id not in grouped_ids)
 
     return processed
 
@@ -8,17 +8,25 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import json
 import logging
-import math
+import os
 import random
 import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
 from datetime import timezone, datetime
 from pathlib import Path
 from typing import Optional, Callable, Any
 
-from .normalizer import normalize
+try:
+    # Static-HTML path for server-rendered sites: plain GET + HTML parse, browser as fallback
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+from .normalizer import normalize_listing_fields
 
 log = logging.getLogger("png_scraper")
 
@@ -33,7 +41,7 @@ def random_ua() -> str:
 
 STEALTH_JS = "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"
 
-@dataclass
+@dataclass(slots=True)   # no per-instance __dict__; scrapes hold thousands of these
 class Listing:
     listing_id:      str
     source_site:     str
@@ -62,28 +70,62 @@ class Listing:
     raw_text:        str            = ""
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Flat copy instead of asdict's recursive deepcopy walk (~10x faster per record)
+        d = {name: getattr(self, name) for name in LISTING_FIELDS}
+        for name in _LIST_FIELDS:
+            d[name] = list(d[name])
+        return d
+
+LISTING_FIELDS = tuple(f.name for f in fields(Listing))
+_LIST_FIELDS = tuple(f.name for f in fields(Listing) if f.default_factory is list)
+
+_DIGITS_RE = re.compile(r"\d+")
 
 def normalise_price(raw: str) -> tuple[Optional[int], str, str]:
-    t = raw.lower().replace(",", "").replace("k", "")
-    nums = re.findall(r"\d+", t)
-    if not nums: return None, "", "low"
-    val = int(nums[0])
-    if "week" in raw.lower() or "pw" in raw.lower(): return val * 4, raw, "high"
+    low = raw.lower()
+    # Only the first number is used, so search rather than findall the whole string
+    m = _DIGITS_RE.search(low.replace(",", "").replace("k", ""))
+    if not m: return None, "", "low"
+    val = int(m.group())
+    if "week" in low or "pw" in low: return val * 4, raw, "high"
     return val, raw, "medium"
 
+# Hardcoded list for engine to avoid circular imports if main.py is busy
+_SUBURBS = ["Waigani","Boroko","Gerehu","Gordons","Hohola","Tokarara","Koki","Badili","Six Mile","Eight Mile","Morata","Erima","Konedobu"]
+_SUBURB_MAP = {s.lower(): s for s in _SUBURBS}
+
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
 def detect_suburb(text: str) -> Optional[str]:
-    # Hardcoded list for engine to avoid circular imports if main.py is busy
-    subs = ["Waigani","Boroko","Gerehu","Gordons","Hohola","Tokarara","Koki","Badili","Six Mile","Eight Mile","Morata","Erima","Konedobu"]
+    # _SUBURBS order is priority order: the first listed suburb found anywhere in the
+    # text wins, as before. Hits must sit on word boundaries ("koki" not in "kokiri").
     t = text.lower()
-    for s in subs:
-        if s.lower() in t: return s
+    n = len(t)
+    for alias, name in _SUBURB_MAP.items():
+        i = t.find(alias)
+        while i != -1:
+            j = i + len(alias)
+            if (i == 0 or not _is_word(t[i - 1])) and (j == n or not _is_word(t[j])):
+                return name
+            i = t.find(alias, i + 1)
     return None
 
+def make_listing_id(listing_url: str, price_raw: str) -> str:
+    # 128-bit BLAKE2b: same 32-hex-char shape as the old MD5 ids, cheaper to compute
+    return hashlib.blake2b(f"{listing_url}:{price_raw}".encode(), digest_size=16).hexdigest()
+
+def migrate_legacy_id(d: dict) -> dict:
+    """Re-key a stored listing dict saved under the pre-BLAKE2b MD5 id scheme, in place."""
+    key = f"{d.get('listing_url')}:{d.get('price_raw')}"
+    if d.get("listing_id") == hashlib.md5(key.encode()).hexdigest():
+        d["listing_id"] = make_listing_id(d.get("listing_url"), d.get("price_raw"))
+    return d
+
 def make_listing(source_site, title, price_raw, location, listing_url, is_verified, raw_text=""):
     # Use the sophisticated normalizer for high-quality data extraction
     combined = f"{title} {raw_text} {location}"
-    norm = normalize(combined)
+    norm = normalize_listing_fields(combined)
 
     # If the specialized normalizer didn't find a price but we have one from the scraper,
     # fall back to the basic engine normalizer as a safety net.
@@ -93,14 +135,16 @@ def make_listing(source_site, title, price_raw, location, listing_url, is_verifi
         price_k, _, conf = normalise_price(price_raw)
 
     return Listing(
-        listing_id      = hashlib.md5(f"{listing_url}:{price_raw}".encode()).hexdigest(),
+        listing_id      = make_listing_id(listing_url, price_raw),
         source_site     = source_site,
         title           = title.strip(),
         price_raw       = price_raw.strip(),
         price_monthly_k = price_k,
         price_confidence= conf,
         location        = location.strip(),
-        suburb          = norm['suburb'] or detect_suburb(combined),
+        # No detect_suburb fallback: its aliases are a subset of the normalizer's, so it
+        # could only re-lowercase and rescan the text to find nothing
+        suburb          = norm['suburb'],
         listing_url     = listing_url,
         is_verified     = norm['is_verified'] or is_verified,
         raw_text        = raw_text[:400],
@@ -115,50 +159,369 @@ async def sleep_human(lo=1.0, hi=3.0):
 
 async def type_human(page, selector, text):
     await page.click(selector)
+    # Field is focused by the click; typing via the keyboard skips re-resolving the selector per key
     for ch in text:
-        await page.type(selector, ch, delay=random.randint(50, 150))
+        await page.keyboard.type(ch, delay=random.randint(50, 150))
 
 async def scroll_page(page, scrolls=3):
     for _ in range(scrolls):
         await page.mouse.wheel(0, random.randint(300, 600))
         await asyncio.sleep(1)
 
+# Scrolls to the bottom until the page height has been stable for two checks, all
+# inside one evaluate: adapts to short pages and long lazy lists alike
+_SCROLL_UNTIL_STABLE_JS = """
+async ({maxIters, quietMs}) => {
+    let last = -1, stable = 0;
+    for (let i = 0; i < maxIters; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, quietMs));
+        const h = document.body.scrollHeight;
+        if (h === last) { if (++stable >= 2) break; } else { stable = 0; last = h; }
+    }
+    return last;
+}
+"""
+
+async def scroll_until_stable(page, max_iters=15, quiet_ms=500):
+    return await page.evaluate(_SCROLL_UNTIL_STABLE_JS, {"maxIters": max_iters, "quietMs": quiet_ms})
+
 async def move_mouse(page):
     await page.mouse.move(random.randint(100, 500), random.randint(100, 500))
 
-async def new_stealth_context(pw, headless=True):
-    browser = await pw.chromium.launch(headless=headless, args=["--no-sandbox"])
-    context = await browser.new_context(user_agent=random_ua())
+# Heavy or tracking requests that listing pages render fine without
+BLOCK_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+BLOCK_HOSTS = ("doubleclick.net", "google-analytics.com", "googletagmanager.com",
+               "googlesyndication.com", "hotjar.com", "segment.io", "segment.com",
+               "amplitude.com", "mixpanel.com", "sentry.io", "cloudflareinsights.com",
+               "clarity.ms")
+# One pass over the URL's host (and its subdomains), not a substring scan per host
+_BLOCK_HOST_RE = re.compile(
+    r"^[a-z]+://(?:[^/?#]*\.)?(?:" + "|".join(map(re.escape, BLOCK_HOSTS)) + r")(?::\d+)?(?:[/?#]|$)"
+)
+
+async def _filter_route(route):
+    req = route.request
+    if req.resource_type in BLOCK_RESOURCE_TYPES or _BLOCK_HOST_RE.match(req.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def block_heavy_resources(context):
+    """Abort images/media/fonts (by resource type, so extension-less CDN URLs too) and trackers."""
+    await context.route("**/*", _filter_route)
+
+async def launch_browser(pw, headless=True):
+    return await pw.chromium.launch(headless=headless, args=["--no-sandbox"])
+
+async def new_stealth_context(browser, session_file=None):
+    # Contexts are cheap and isolate cookies/UA, so scrapers share one browser
+    opts = {"user_agent": random_ua()}
+    if session_file and Path(session_file).exists():
+        opts["storage_state"] = str(session_file)
+    context = await browser.new_context(**opts)
+    await context.add_init_script(STEALTH_JS)
+    return context
+
+async def new_persistent_context(browser_type, user_data_dir, headless=True, session_file=None):
+    """Context backed by an on-disk Chromium profile (HTTP cache, service workers,
+    IndexedDB survive restarts). A fresh profile is seeded from session_file's cookies."""
+    fresh = not Path(user_data_dir).exists()
+    # Fixed UA: a persistent profile should not change fingerprint between runs
+    context = await browser_type.launch_persistent_context(
+        str(user_data_dir), headless=headless, args=["--no-sandbox"], user_agent=_UA_POOL[0],
+    )
     await context.add_init_script(STEALTH_JS)
-    return browser, context
+    if fresh and session_file and Path(session_file).exists():
+        try:
+            await context.add_cookies(json.loads(Path(session_file).read_text()).get("cookies", []))
+        except Exception as e:
+            log.debug(f"Could not seed profile from {session_file}: {e}")
+    return context
+
+# ── card extraction ───────────────────────────────────────────────────────────
+# Every card on the page in one evaluate() instead of a CDP round-trip per selector
+# per card: the first card selector (in order) with any match, then per field the
+# first non-empty text over its cascade. href is the card's own if ownHref and it is
+# an <a>, then linkSels, then any a[href]. Cascades stay ordered lists; a joined
+# "a, b" group would pick by document order.
+_CARDS_JS = """
+({cardSels, fields, linkSels, ownHref, withText}) => {
+    const firstText = (card, sels) => {
+        for (const s of sels) {
+            const el = card.querySelector(s);
+            const t = el ? (el.innerText || "").trim() : "";
+            if (t) return t;
+        }
+        return "";
+    };
+    const firstHref = (card) => {
+        const own = ownHref && card.tagName === "A" ? (card.getAttribute("href") || "").trim() : "";
+        if (own) return own;
+        for (const s of linkSels) {
+            const el = card.querySelector(s);
+            const v = el ? (el.getAttribute("href") || "").trim() : "";
+            if (v) return v;
+        }
+        const a = card.querySelector("a[href]");
+        return a ? (a.getAttribute("href") || "").trim() : "";
+    };
+    let sel = "", found = [];
+    for (const s of cardSels) {
+        found = document.querySelectorAll(s);
+        if (found.length) { sel = s; break; }
+    }
+    const names = Object.keys(fields);
+    const out = [];
+    for (const card of found) {
+        try {
+            const c = {};
+            for (const n of names) c[n] = firstText(card, fields[n]);
+            c.href = firstHref(card);
+            if (withText) c.text = card.innerText || "";
+            out.push(c);
+        } catch (e) {}
+    }
+    return {sel, cards: out};
+}
+"""
+
+def any_of(sels) -> str:
+    """One selector group matching any entry. For waits and "is there one" checks only:
+    a group resolves in document order, so field cascades stay ordered lists."""
+    return ", ".join(sels)
+
+def visible_any(sels) -> str:
+    # :visible on each alternative; on the joined group it would only filter the last one
+    return ", ".join(f"{s}:visible" for s in sels)
+
+async def has_visible(page, sels) -> bool:
+    """Whether any of sels is visible now: one locator count, no polling."""
+    try: return await page.locator(visible_any(sels)).count() > 0
+    except Exception: return False
+
+async def extract_cards(page, card_sels, fields: dict, link_sels, own_href=False,
+                        with_text=False) -> tuple[str, list[dict]]:
+    """(matched card selector, [{field: text, ..., "href", ["text"]}]) for a loaded page."""
+    found = await page.evaluate(_CARDS_JS, {
+        "cardSels": card_sels, "fields": fields, "linkSels": link_sels,
+        "ownHref": own_href, "withText": with_text,
+    })
+    return found["sel"], found["cards"]
+
+# ── static HTML path ──────────────────────────────────────────────────────────
+# Shared by the scrapers that fetch server-rendered pages over httpx before
+# (or instead of) starting a browser. Same cascades as extract_cards.
+
+# Cookie jar shared by the static (httpx) fetches; kept between runs like FB's session
+COOKIE_FILE = Path(os.getenv("AGENCY_COOKIES_PATH", (Path(__file__).parent.parent.parent / "data" / "agency_cookies.json").resolve()))
+
+def new_http_client():
+    """httpx client for static page fetches, warm-started from COOKIE_FILE."""
+    import httpx
+    headers = {"User-Agent": random_ua(), "Accept-Language": "en-US,en;q=0.9"}
+    limits  = httpx.Limits(max_connections=8, max_keepalive_connections=8)
+    client  = httpx.AsyncClient(headers=headers, limits=limits, timeout=30, follow_redirects=True)
+    try:
+        for c in json.loads(COOKIE_FILE.read_text()):
+            client.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return client
+
+def save_http_cookies(client) -> None:
+    try:
+        COOKIE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        COOKIE_FILE.write_text(json.dumps([
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in client.cookies.jar
+        ]))
+    except OSError as e:
+        log.debug(f"Could not save http cookies: {e}")
+
+class maybe_http_client:
+    """Use a shared client as-is; otherwise open (and close, saving its cookies) a private one."""
+    def __init__(self, shared):
+        self.shared = shared
+        self.own = None
+
+    async def __aenter__(self):
+        if self.shared is not None: return self.shared
+        self.own = new_http_client()
+        return self.own
+
+    async def __aexit__(self, *exc):
+        if self.own is not None:
+            save_http_cookies(self.own)
+            await self.own.aclose()
+
+def _html_child(card, sel: str):
+    # querySelector semantics: descendants only (selectolax also matches the node itself)
+    return next((n for n in card.css(sel) if n != card), None)
+
+def html_first_text(card, sels) -> str:
+    for sel in sels:
+        el = _html_child(card, sel)
+        t = el.text(separator=" ", strip=True) if el else ""
+        if t: return t
+    return ""
+
+def html_href(card, link_sels) -> str:
+    # The card's own href if it is an <a>, then link_sels in order, then any a[href]
+    own = (card.attributes.get("href") or "").strip() if card.tag == "a" else ""
+    if own: return own
+    for sel in (*link_sels, "a[href]"):
+        el = _html_child(card, sel)
+        v = (el.attributes.get("href") or "").strip() if el else ""
+        if v: return v
+    return ""
+
+def html_cards(tree, card_sels, fields: dict, link_sels) -> tuple[str, list[dict]]:
+    """Cards under the first card selector (in order) with any match, as dicts of
+    field -> first non-empty text over its cascade, plus "href" and the card "text"."""
+    for sel in card_sels:
+        found = tree.css(sel)
+        if found: break
+    else:
+        return "", []
+    return sel, [{
+        **{name: html_first_text(c, sels) for name, sels in fields.items()},
+        "href": html_href(c, link_sels),
+        "text": " ".join(c.text(separator=" ").split()),
+    } for c in found]
+
+def html_has_next(tree, next_sels, link_texts) -> bool:
+    # Playwright-only :has-text() selectors become a link-text check
+    if any(tree.css_first(sel) for sel in next_sels if ":has-text" not in sel): return True
+    return any(k in a.text(strip=True).lower() for a in tree.css("a") for k in link_texts)
 
 class PNGScraper(ABC):
     SOURCE_SITE: str = "Unknown"
     MAX_RETRIES: int = 2
-    def __init__(self, headless=True):
+    # Human-cadence padding: "high" mouse moves + pauses, "med" pauses only, "low" neither
+    STEALTH_LEVEL: str = "high"
+    def __init__(self, headless=True, stealth_level=None, client=None):
         self.headless = headless
+        self.stealth_level = stealth_level or self.STEALTH_LEVEL
+        self.client = client  # shared httpx.AsyncClient for the static path, if any
         self._page = None
+        self._static_tried = False
 
     @abstractmethod
     async def scrape(self, context, on_progress=None) -> list[Listing]: ...
 
-    async def run(self, on_progress=None) -> list[Listing]:
-        from playwright.async_api import async_playwright
-        async with async_playwright() as pw:
-            browser, context = await new_stealth_context(pw, self.headless)
+    # Card hooks for _build_new: the listing_id make_listing would assign (None drops
+    # the card), and the Listing itself
+    def _card_id(self, raw: dict) -> Optional[str]: return None
+    def _build_listing(self, raw: dict) -> Optional[Listing]: return None
+
+    # Static-path hooks. Scrapers of server-rendered sites return their page 1..N URLs
+    # from _static_urls(); run() then tries _scrape_http() before any browser work.
+    def _static_urls(self) -> list[str]: return []
+    def _static_cards(self, tree) -> list[dict]: return []
+    def _static_has_next(self, tree) -> bool: return False
+    def _static_alt_url(self, page_num: int) -> Optional[str]: return None
+
+    def _build_new(self, cards: list[dict], skip=frozenset()) -> list[Listing]:
+        """Listings for extracted cards, minus repeats and ids in skip (already collected)."""
+        listings, seen = [], set()
+        for raw in cards:
             try:
-                self._page = await context.new_page()
-                return await self.scrape(context, on_progress=on_progress)
+                # Dedup on the id before building the Listing: repeats skip the normalizer
+                lid = self._card_id(raw)
+                if lid is None or lid in seen or lid in skip: continue
+                seen.add(lid)
+                listing = self._build_listing(raw)
+                if listing: listings.append(listing)
             except Exception as e:
-                log.error(f"[{self.SOURCE_SITE}] Scrape error: {e}")
-                return []
+                log.debug(f"[{self.SOURCE_SITE}] Card parse error: {e}")
+        return listings
+
+    def _collect(self, batch, results: list, seen_ids: set, page_num: int, on_progress=None) -> int:
+        """Append batch's unseen listings to results, log and report progress; returns the new count."""
+        new_count = 0
+        for listing in batch:
+            if listing.listing_id not in seen_ids:
+                seen_ids.add(listing.listing_id)
+                results.append(listing)
+                new_count += 1
+        log.info(f"[{self.SOURCE_SITE}] Running total: {len(results)}")
+        if on_progress: on_progress(new_count, page_num)
+        return new_count
+
+    async def run(self, on_progress=None, pw=None, browser=None) -> list[Listing]:
+        # Server-rendered sites: try a plain HTTP fetch first, no Chromium at all
+        if HAS_SELECTOLAX and not self._static_tried and self._static_urls():
+            self._static_tried = True
+            try:
+                results = await self._scrape_http(on_progress)
+                if results: return results
+                log.info(f"[{self.SOURCE_SITE}] Static fetch found no cards — using the browser")
+            except Exception as e:
+                log.warning(f"[{self.SOURCE_SITE}] Static fetch failed ({e}) — using the browser")
+        # run_all passes one shared browser; standalone runs launch (and close) their own
+        if browser is None:
+            if pw is None:
+                from playwright.async_api import async_playwright
+                async with async_playwright() as pw:
+                    return await self.run(on_progress, pw=pw)
+            browser = await launch_browser(pw, self.headless)
+            try: return await self.run(on_progress, browser=browser)
             finally: await browser.close()
+        context = await new_stealth_context(browser)
+        try:
+            self._page = await context.new_page()
+            return await self.scrape(context, on_progress=on_progress)
+        except Exception as e:
+            log.error(f"[{self.SOURCE_SITE}] Scrape error: {e}")
+            return []
+        finally: await context.close()
+
+    async def _scrape_http(self, on_progress=None) -> list[Listing]:
+        """
+        Fetch _static_urls() over HTTP and parse them with selectolax. Page 1 decides
+        whether to paginate; later pages are fetched together and consumed in order,
+        stopping at the first that fails (after _static_alt_url) or adds nothing new.
+        """
+        import httpx
+        urls = self._static_urls()
+        results: list[Listing] = []
+        seen_ids: set[str] = set()
+
+        async def fetch(client, url):
+            try:
+                resp = await client.get(url)
+                if resp.status_code >= 400: return None
+                return LexborHTMLParser(resp.text)
+            except httpx.HTTPError as e:
+                log.warning(f"[{self.SOURCE_SITE}] {url} failed: {e}")
+                return None
+
+        def add(tree, page_num: int) -> bool:
+            cards = self._static_cards(tree)
+            if not cards:
+                log.warning(f"[{self.SOURCE_SITE}] No cards on page {page_num} (static)")
+                return False
+            # A clamped page N (site re-serves its last page) adds nothing new
+            return self._collect(self._build_new(cards, seen_ids), results, seen_ids, page_num, on_progress) > 0
 
-    async def _goto(self, url: str, wait_until: str = "load") -> bool:
+        async with maybe_http_client(self.client) as client:
+            first = await fetch(client, urls[0])
+            if first is None or not add(first, 1): return results
+            if len(urls) < 2 or not self._static_has_next(first): return results
+            trees = await asyncio.gather(*(fetch(client, u) for u in urls[1:]))
+            for page_num, tree in enumerate(trees, start=2):
+                alt = self._static_alt_url(page_num) if tree is None else None
+                if alt: tree = await fetch(client, alt)
+                if tree is None or not add(tree, page_num): break
+        return results
+
+    async def _goto(self, url: str, wait_until: str = "load", page=None) -> bool:
+        page = page or self._page
         for attempt in range(1, self.MAX_RETRIES + 1):
             try:
                 log.info(f"[{self.SOURCE_SITE}] Navigating to {url}")
-                resp = await self._page.goto(url, wait_until=wait_until, timeout=45_000)
+                resp = await page.goto(url, wait_until=wait_until, timeout=45_000)
                 log.info(f"[{self.SOURCE_SITE}] Status: {resp.status if resp else 'N/A'}")
                 await asyncio.sleep(2)
                 return True
@@ -166,3 +529,30 @@ class PNGScraper(ABC):
                 log.warning(f"[{self.SOURCE_SITE}] Nav failed: {e}")
                 await asyncio.sleep(3)
         return False
+
+    async def _fetch_many(self, context, urls: list[str], parser, max_parallel: int = 3,
+                          wait_until: str = "load") -> list:
+        """
+        Load urls concurrently on a pool of up to max_parallel pages in one context,
+        reused across urls, and return parser(page, url) for each, in input order
+        (None where navigation failed).
+        """
+        if not urls: return []
+        pool: asyncio.Queue = asyncio.Queue()
+        pages = [await context.new_page() for _ in range(min(max_parallel, len(urls)))]
+        for p in pages: pool.put_nowait(p)
+
+        async def one(url):
+            page = await pool.get()
+            try:
+                if not await self._goto(url, wait_until=wait_until, page=page): return None
+                return await parser(page, url)
+            except Exception as e:
+                log.warning(f"[{self.SOURCE_SITE}] {url} failed: {e}")
+                return None
+            finally: pool.put_nowait(page)
+
+        try:
+            return await asyncio.gather(*(one(u) for u in urls))
+        finally:
+            for p in pages: await p.close()
@@ -9,17 +9,22 @@ from __future__ import annotations
 import argparse
 import asyncio
 import csv
-import json
 import logging
+import os
 import time
 from datetime import datetime, timezone
+from operator import attrgetter
 from pathlib import Path
 from typing import Optional, Callable, Any
 
-from png_scraper.engine import Listing, log
+import orjson
+
+from png_scraper.engine import (
+    HAS_SELECTOLAX, LISTING_FIELDS, Listing, launch_browser, log, new_http_client, save_http_cookies,
+)
 from png_scraper.scrapers.hausples       import HausplesScraper
 from png_scraper.scrapers.professionals  import ProfessionalsScraper
-from png_scraper.scrapers.general_agency import GeneralAgencyScraper, AGENCY_CONFIGS
+from png_scraper.scrapers.general_agency import AGENCY_CONFIGS, GeneralAgencyScraper
 from png_scraper.scrapers.facebook       import FacebookScraper
 
 OUTPUT_DIR = Path("output")
@@ -28,7 +33,8 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 def deduplicate(listings: list[Listing]) -> list[Listing]:
     seen_ids:    dict[str, Listing] = {}
     seen_fuzzy:  dict[str, Listing] = {}
-    unique: list[Listing] = []
+    unique: dict[str, Listing] = {}   # insertion-ordered; O(1) eviction by id
+    folded: dict[str, str] = {}         # suburb/type names are canonical: fold each once per run
     sorted_listings = sorted(listings, key=lambda l: (not l.is_verified, l.source_site))
 
     for lst in sorted_listings:
@@ -36,32 +42,42 @@ def deduplicate(listings: list[Listing]) -> list[Listing]:
         seen_ids[lst.listing_id] = lst
 
         if lst.suburb and lst.price_monthly_k and lst.property_type:
-            fuzzy_key = (str(lst.suburb).lower().strip(), int(lst.price_monthly_k), str(lst.property_type).lower().strip(), int(lst.bedrooms or 0))
+            sub, ptype = folded.get(lst.suburb), folded.get(lst.property_type)
+            if sub is None: sub = folded[lst.suburb] = str(lst.suburb).lower().strip()
+            if ptype is None: ptype = folded[lst.property_type] = str(lst.property_type).lower().strip()
+            fuzzy_key = (sub, int(lst.price_monthly_k), ptype, int(lst.bedrooms or 0))
             if fuzzy_key in seen_fuzzy:
                 existing = seen_fuzzy[fuzzy_key]
                 if lst.is_verified and not existing.is_verified:
                     seen_fuzzy[fuzzy_key] = lst
-                    unique = [l for l in unique if l.listing_id != existing.listing_id]
-                    unique.append(lst)
+                    del unique[existing.listing_id]
+                    unique[lst.listing_id] = lst
                 continue
             seen_fuzzy[fuzzy_key] = lst
-        unique.append(lst)
-    return unique
+        unique[lst.listing_id] = lst
+    return list(unique.values())
+
+_listing_row = attrgetter(*LISTING_FIELDS)
 
 def export_json(listings: list[Listing], path: Path) -> None:
-    data = [l.to_dict() if hasattr(l, "to_dict") else l for l in listings]
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    log.info(f"JSON → {path}  ({len(data)} records)")
+    # orjson serialises Listing dataclasses natively, skipping the asdict deep copy.
+    # Write a sibling temp file and swap it in, so readers never see a partial file.
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(orjson.dumps(listings, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+    log.info(f"JSON → {path}  ({len(listings)} records)")
 
 def export_csv(listings: list[Listing], path: Path) -> None:
     if not listings: return
-    dicts = [l.to_dict() if hasattr(l, "to_dict") else l for l in listings]
-    fields = list(dicts[0].keys())
+    if isinstance(listings[0], Listing):
+        header, rows = LISTING_FIELDS, map(_listing_row, listings)
+    else:
+        header = tuple(listings[0].keys())
+        rows = ([d.get(k, "") for k in header] for d in listings)
     with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(dicts)
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
     log.info(f"CSV  → {path}  ({len(listings)} records)")
 
 async def run_all(
@@ -95,11 +111,14 @@ async def run_all(
     if _want("png buy n rent"):
         instance_tasks.append(("PNG Buy n Rent Rent", HausplesScraper(base_url="https://www.pngbuynrent.com", source_site="PNG Buy n Rent", max_pages=max_pages, headless=headless, mode="rent")))
         instance_tasks.append(("PNG Buy n Rent Sale", HausplesScraper(base_url="https://www.pngbuynrent.com", source_site="PNG Buy n Rent", max_pages=max_pages, headless=headless, mode="sale")))
+    # Static-fetch scrapers share one keep-alive HTTP pool and cookie jar
+    agency_cfgs = [cfg for cfg in AGENCY_CONFIGS if _want(cfg.source_site)]
+    static = _want("professionals") or any(c.render == "http" for c in agency_cfgs)
+    client = new_http_client() if HAS_SELECTOLAX and static else None
     if _want("professionals"):
-        instance_tasks.append(("The Professionals", ProfessionalsScraper(max_pages=max_pages, headless=headless)))
-    for cfg in AGENCY_CONFIGS:
-        if _want(cfg.source_site):
-            instance_tasks.append((cfg.source_site, GeneralAgencyScraper(cfg, headless=headless)))
+        instance_tasks.append(("The Professionals", ProfessionalsScraper(max_pages=max_pages, headless=headless, client=client)))
+    for cfg in agency_cfgs:
+        instance_tasks.append((cfg.source_site, GeneralAgencyScraper(cfg, headless=headless, client=client)))
     if include_facebook or _want("facebook"):
         instance_tasks.append(("Facebook Marketplace", FacebookScraper(scroll_rounds=10, headless=headless)))
 
@@ -108,13 +127,13 @@ async def run_all(
     completed = 0
     total = len(instance_tasks)
 
-    async def _run_task(name, inst):
+    async def _run_task(name, inst, browser):
         nonlocal completed
         async with sem:
             try:
                 def _sub_prog(count, page):
                     if on_progress: on_progress(name, count, (completed / total) * 100)
-                res = await inst.run(on_progress=_sub_prog)
+                res = await inst.run(on_progress=_sub_prog, browser=browser)
                 completed += 1
                 if on_progress: on_progress(name, 0, (completed / total) * 100)
                 return res
@@ -123,7 +142,17 @@ async def run_all(
                 completed += 1
                 return []
 
-    batches = await asyncio.gather(*[_run_task(n, i) for n, i in instance_tasks])
+    # One Playwright driver and one Chromium for the whole run; each scraper gets a context
+    from playwright.async_api import async_playwright
+    async with async_playwright() as pw:
+        browser = await launch_browser(pw, headless)
+        try:
+            batches = await asyncio.gather(*[_run_task(n, i, browser) for n, i in instance_tasks])
+        finally:
+            await browser.close()
+            if client is not None:
+                save_http_cookies(client)
+                await client.aclose()
     for b in batches:
         if isinstance(b, list): all_results.extend(b)
     unified = deduplicate(all_results)
@@ -11,11 +11,13 @@ Also handles: insufficient data, cross-suburb fallback, confidence ratings.
 """
 
 import json
-import math
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
 from typing import Optional
 from enum import Enum
 
+import numpy as np
+
 
 # ── ENUMS & MODELS ────────────────────────────────────────────────────────────
 
@@ -32,7 +34,7 @@ class DataConfidence(str, Enum):
     LOW    = "Low"      # 1 listing or city-wide fallback
 
 
-@dataclass
+@dataclass(slots=True)
 class SuburbStats:
     suburb: str
     sample_size: int
@@ -44,7 +46,7 @@ class SuburbStats:
     confidence: DataConfidence
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketValueResult:
     # Input
     fb_price: int
@@ -92,20 +94,39 @@ FORMAL_LISTINGS_DB: dict[str, list[int]] = {
 # City-wide fallback (all suburbs combined)
 ALL_CITY_PRICES = [p for prices in FORMAL_LISTINGS_DB.values() for p in prices]
 
+def _pack_prices(db: dict[str, list[int]]) -> tuple[np.ndarray, dict[str, tuple[int, int]]]:
+    # All prices in one contiguous array, each suburb's run sorted in place
+    packed = np.asarray([p for prices in db.values() for p in prices], dtype=np.int64)
+    spans, offset = {}, 0
+    for key, prices in db.items():
+        spans[key] = (offset, offset + len(prices))
+        packed[offset:offset + len(prices)].sort()
+        offset += len(prices)
+    return packed, spans
+
+
+_ALL_PRICES, _SUBURB_SPANS = _pack_prices(FORMAL_LISTINGS_DB)
+# Suburbs get zero-copy views into the packed array
+_SUBURB_ARRAYS: dict[str, np.ndarray] = {k: _ALL_PRICES[a:b] for k, (a, b) in _SUBURB_SPANS.items()}
+_ALL_CITY = np.sort(_ALL_PRICES)
+
 
 # ── STATS HELPERS ─────────────────────────────────────────────────────────────
 
-def compute_stats(prices: list[int], suburb: str) -> SuburbStats:
-    n = len(prices)
+def compute_stats(prices, suburb: str) -> SuburbStats:
+    return _sorted_stats(np.sort(np.asarray(prices, dtype=np.int64)), suburb)
+
+
+def _sorted_stats(arr: np.ndarray, suburb: str) -> SuburbStats:
+    # Caller guarantees arr is sorted ascending (the packed DB arrays above are)
+    n = arr.size
     if n == 0:
         return SuburbStats(suburb, 0, 0, 0, 0, 0, 0, DataConfidence.LOW)
 
-    avg = sum(prices) / n
-    sorted_p = sorted(prices)
+    avg = float(arr.mean())
     mid = n // 2
-    median = sorted_p[mid] if n % 2 else (sorted_p[mid - 1] + sorted_p[mid]) / 2
-    variance = sum((p - avg) ** 2 for p in prices) / n
-    std_dev = math.sqrt(variance)
+    median = int(arr[mid]) if n % 2 else (int(arr[mid - 1]) + int(arr[mid])) / 2
+    std_dev = float(arr.std())
 
     if n >= 5:
         conf = DataConfidence.HIGH
@@ -120,33 +141,40 @@ def compute_stats(prices: list[int], suburb: str) -> SuburbStats:
         avg_price=round(avg, 2),
         median_price=round(median, 2),
         std_dev=round(std_dev, 2),
-        min_price=min(prices),
-        max_price=max(prices),
+        min_price=int(arr[0]),
+        max_price=int(arr[-1]),
         confidence=conf,
     )
 
 
+# The DB is static, so stats are computed once; callers get a copy carrying their own suburb name
+_STATS_CACHE: dict[str, SuburbStats] = {k: _sorted_stats(v, k.title()) for k, v in _SUBURB_ARRAYS.items()}
+_CITY_STATS = _sorted_stats(_ALL_CITY, "Port Moresby (city-wide)")
+_CITY_STATS.confidence = DataConfidence.LOW
+
+
+@lru_cache(maxsize=1024)
+def _partial_match(key: str) -> Optional[str]:
+    # Try partial match (e.g. "Gerehu Stage 3" → "gerehu")
+    for db_key in _STATS_CACHE:
+        if db_key in key or key in db_key:
+            return db_key
+    return None
+
+
 def get_suburb_stats(suburb: str) -> Optional[SuburbStats]:
     """
     Get stats for the given suburb. Falls back to city-wide if no data.
     Returns None only if absolutely no data exists anywhere.
     """
     key = suburb.strip().lower()
-    prices = FORMAL_LISTINGS_DB.get(key)
-
-    if prices and len(prices) >= 1:
-        return compute_stats(prices, suburb)
-
-    # Try partial match (e.g. "Gerehu Stage 3" → "gerehu")
-    for db_key, db_prices in FORMAL_LISTINGS_DB.items():
-        if db_key in key or key in db_key:
-            return compute_stats(db_prices, suburb)
+    db_key = key if key in _STATS_CACHE else _partial_match(key)
+    if db_key is not None:
+        return replace(_STATS_CACHE[db_key], suburb=suburb)
 
     # City-wide fallback
-    if ALL_CITY_PRICES:
-        stats = compute_stats(ALL_CITY_PRICES, "Port Moresby (city-wide)")
-        stats.confidence = DataConfidence.LOW
-        return stats
+    if _CITY_STATS.sample_size:
+        return replace(_CITY_STATS)
 
     return None
 
@@ -165,6 +193,14 @@ PROPERTY_TYPE_ADJUSTMENTS = {
     "land":       0.50,
 }
 
+# Index form of the table for the batch path; the last slot is the default for unknown types
+_TYPE_IDX = {t: i for i, t in enumerate(PROPERTY_TYPE_ADJUSTMENTS)}
+_TYPE_MULT = np.array([*PROPERTY_TYPE_ADJUSTMENTS.values(), 1.0])
+_DEFAULT_TYPE_ID = len(_TYPE_IDX)
+
+def _type_id(property_type: Optional[str]) -> int:
+    return _TYPE_IDX.get(property_type.lower(), _DEFAULT_TYPE_ID) if property_type else _DEFAULT_TYPE_ID
+
 def get_type_adjusted_avg(raw_avg: float, property_type: Optional[str]) -> float:
     """
     Adjust the suburb average for property type differences.
@@ -185,66 +221,34 @@ STRONG_DEAL           = 30.0    # % below → "Strong Deal"
 STRONG_OVERPRICED     = 30.0    # % above → "Severely Overpriced"
 
 
+def _classify(pct_vs_avg: float, deal_threshold: float = DEAL_THRESHOLD,
+              overpriced_threshold: float = OVERPRICED_THRESHOLD) -> MarketLabel:
+    if pct_vs_avg <= -deal_threshold:
+        return MarketLabel.DEAL
+    if pct_vs_avg >= overpriced_threshold:
+        return MarketLabel.OVERPRICED
+    return MarketLabel.FAIR
+
+
 # ── MAIN SCORING FUNCTION ─────────────────────────────────────────────────────
 
-def score_market_value(
+def _market_result(
     fb_price_monthly_pgk: int,
     suburb: str,
-    property_type: Optional[str] = None,
-    bedrooms: Optional[int] = None,
+    property_type: Optional[str],
+    stats: SuburbStats,
+    adjusted_avg: float,
+    adjusted_median: float,
+    pct_vs_avg: float,
+    pct_vs_median: float,
     deal_threshold: float = DEAL_THRESHOLD,
     overpriced_threshold: float = OVERPRICED_THRESHOLD,
 ) -> MarketValueResult:
-    """
-    Compare a Facebook listing price against formal-site averages.
-
-    Args:
-        fb_price_monthly_pgk: Normalized monthly price in PGK (from normalizer.py)
-        suburb:               Suburb name (e.g. "Boroko")
-        property_type:        Optional — "House", "Apartment", "Room", etc.
-        bedrooms:             Optional — used for future bedroom-cohort analysis
-        deal_threshold:       % below avg to be called a Deal (default 15)
-        overpriced_threshold: % above avg to be called Overpriced (default 15)
-
-    Returns:
-        MarketValueResult dataclass with all scoring details
-    """
-
-    stats = get_suburb_stats(suburb)
-
-    # ── No data at all ─────────────────────────────────────────────────────
-    if stats is None or stats.avg_price == 0:
-        return MarketValueResult(
-            fb_price=fb_price_monthly_pgk,
-            suburb=suburb,
-            property_type=property_type,
-            benchmark_avg=None,
-            benchmark_median=None,
-            benchmark_sample_size=0,
-            benchmark_confidence=DataConfidence.LOW,
-            label=MarketLabel.UNKNOWN,
-            pct_vs_avg=None,
-            pct_vs_median=None,
-            summary=f"No formal listing data available for {suburb}.",
-            recommendation="Cannot assess — check Hausples manually for this area.",
-        )
-
-    # ── Adjust benchmark for property type ─────────────────────────────────
-    adjusted_avg    = get_type_adjusted_avg(stats.avg_price, property_type)
-    adjusted_median = get_type_adjusted_avg(stats.median_price, property_type)
-
-    # ── Compute deviation ──────────────────────────────────────────────────
-    pct_vs_avg    = ((fb_price_monthly_pgk - adjusted_avg) / adjusted_avg) * 100
-    pct_vs_median = ((fb_price_monthly_pgk - adjusted_median) / adjusted_median) * 100
-
+    """Label and describe a price whose deviation from the benchmark is already known."""
     # ── Assign label ───────────────────────────────────────────────────────
-    if pct_vs_avg <= -deal_threshold:
-        if pct_vs_avg <= -STRONG_DEAL:
-            label = MarketLabel.DEAL
-            quality = "strong "
-        else:
-            label = MarketLabel.DEAL
-            quality = ""
+    label = _classify(pct_vs_avg, deal_threshold, overpriced_threshold)
+    if label is MarketLabel.DEAL:
+        quality = "strong " if pct_vs_avg <= -STRONG_DEAL else ""
         direction = "below"
         abs_pct = abs(pct_vs_avg)
         summary = (
@@ -258,13 +262,8 @@ def score_market_value(
             + (" Low data confidence — treat with caution." if stats.confidence == DataConfidence.LOW else "")
         )
 
-    elif pct_vs_avg >= overpriced_threshold:
-        if pct_vs_avg >= STRONG_OVERPRICED:
-            label = MarketLabel.OVERPRICED
-            quality = "severely "
-        else:
-            label = MarketLabel.OVERPRICED
-            quality = ""
+    elif label is MarketLabel.OVERPRICED:
+        quality = "severely " if pct_vs_avg >= STRONG_OVERPRICED else ""
         abs_pct = abs(pct_vs_avg)
         summary = (
             f"🔴 {quality.upper()}OVERPRICED — K{fb_price_monthly_pgk:,}/mo is "
@@ -277,7 +276,6 @@ def score_market_value(
         )
 
     else:
-        label = MarketLabel.FAIR
         direction = "above" if pct_vs_avg > 0 else "below"
         abs_pct = abs(pct_vs_avg)
         summary = (
@@ -311,32 +309,143 @@ def score_market_value(
     )
 
 
+def score_market_value(
+    fb_price_monthly_pgk: int,
+    suburb: str,
+    property_type: Optional[str] = None,
+    bedrooms: Optional[int] = None,
+    deal_threshold: float = DEAL_THRESHOLD,
+    overpriced_threshold: float = OVERPRICED_THRESHOLD,
+) -> MarketValueResult:
+    """
+    Compare a Facebook listing price against formal-site averages.
+
+    Args:
+        fb_price_monthly_pgk: Normalized monthly price in PGK (from normalizer.py)
+        suburb:               Suburb name (e.g. "Boroko")
+        property_type:        Optional — "House", "Apartment", "Room", etc.
+        bedrooms:             Optional — used for future bedroom-cohort analysis
+        deal_threshold:       % below avg to be called a Deal (default 15)
+        overpriced_threshold: % above avg to be called Overpriced (default 15)
+
+    Returns:
+        MarketValueResult dataclass with all scoring details
+    """
+
+    stats = get_suburb_stats(suburb)
+
+    # ── No data at all ─────────────────────────────────────────────────────
+    if stats is None or stats.avg_price == 0:
+        return MarketValueResult(
+            fb_price=fb_price_monthly_pgk,
+            suburb=suburb,
+            property_type=property_type,
+            benchmark_avg=None,
+            benchmark_median=None,
+            benchmark_sample_size=0,
+            benchmark_confidence=DataConfidence.LOW,
+            label=MarketLabel.UNKNOWN,
+            pct_vs_avg=None,
+            pct_vs_median=None,
+            summary=f"No formal listing data available for {suburb}.",
+            recommendation="Cannot assess — check Hausples manually for this area.",
+        )
+
+    # ── Adjust benchmark for property type ─────────────────────────────────
+    adjusted_avg    = get_type_adjusted_avg(stats.avg_price, property_type)
+    adjusted_median = get_type_adjusted_avg(stats.median_price, property_type)
+
+    # ── Compute deviation ──────────────────────────────────────────────────
+    pct_vs_avg    = ((fb_price_monthly_pgk - adjusted_avg) / adjusted_avg) * 100
+    pct_vs_median = ((fb_price_monthly_pgk - adjusted_median) / adjusted_median) * 100
+
+    return _market_result(
+        fb_price_monthly_pgk, suburb, property_type, stats,
+        adjusted_avg, adjusted_median, pct_vs_avg, pct_vs_median,
+        deal_threshold, overpriced_threshold,
+    )
+
+
 # ── BATCH SCORER ─────────────────────────────────────────────────────────────
 
-def score_listings_batch(listings: list[dict]) -> list[dict]:
+_RESULT_FIELDS = tuple(f.name for f in fields(MarketValueResult))
+
+
+def _result_dict(result: MarketValueResult) -> dict:
+    # Flat field copy: the result holds only scalars and enums, so asdict's recursive walk is wasted
+    return {f: getattr(result, f) for f in _RESULT_FIELDS}
+
+
+def score_listings_batch(listings: list[dict], describe: bool = True) -> list[dict]:
     """
     Score a list of normalized listing dicts (output of normalizer.py).
     Adds 'market_value' key to each listing in-place.
 
     Args:
         listings: List of dicts with keys: price_pgk_monthly, suburb, property_type
+        describe: If False, skip the summary/recommendation text and return only
+                  label, deviations and benchmark (for aggregators and filters)
     Returns:
         Same list with 'market_value' dict injected into each entry
     """
+    # One stats lookup per distinct suburb and one type id per distinct type;
+    # type multipliers and deviations are then applied in one NumPy pass
+    suburb_stats = {}
+    type_ids = {}
+    rows = []
     for listing in listings:
         price = listing.get("price_pgk_monthly")
         suburb = listing.get("suburb") or ""
         p_type = listing.get("property_type")
 
         if price and suburb:
-            result = score_market_value(price, suburb, p_type)
-            listing["market_value"] = asdict(result)
+            if suburb not in suburb_stats:
+                stats = get_suburb_stats(suburb)
+                suburb_stats[suburb] = None if stats is None or stats.avg_price == 0 else stats
+            stats = suburb_stats[suburb]
+            if stats is None:
+                listing["market_value"] = _result_dict(score_market_value(price, suburb, p_type))
+            else:
+                if p_type not in type_ids:
+                    type_ids[p_type] = _type_id(p_type)
+                rows.append((listing, price, suburb, p_type, stats, type_ids[p_type]))
         else:
             listing["market_value"] = {
                 "label": MarketLabel.UNKNOWN,
                 "summary": "Missing price or suburb data.",
                 "pct_vs_avg": None,
             }
+
+    if rows:
+        n = len(rows)
+        prices = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+        mult = _TYPE_MULT[np.fromiter((r[5] for r in rows), dtype=np.intp, count=n)]
+        avgs = np.fromiter((r[4].avg_price for r in rows), dtype=np.float64, count=n) * mult
+        medians = np.fromiter((r[4].median_price for r in rows), dtype=np.float64, count=n) * mult
+        pct_avg = ((prices - avgs) / avgs * 100).tolist()
+        pct_median = ((prices - medians) / medians * 100).tolist()
+        if not describe:
+            # Same classifier and default thresholds as _market_result, minus the text
+            for (listing, _, _, p_type, stats, _), adj_avg, pa, pm in zip(
+                rows, avgs.tolist(), pct_avg, pct_median
+            ):
+                listing["market_value"] = {
+                    "label": _classify(pa),
+                    "pct_vs_avg": round(pa, 2),
+                    "pct_vs_median": round(pm, 2),
+                    "benchmark_avg": round(adj_avg if p_type else stats.avg_price, 2),
+                    "benchmark_sample_size": stats.sample_size,
+                    "benchmark_confidence": stats.confidence,
+                }
+            return listings
+        for (listing, price, suburb, p_type, stats, _), adj_avg, adj_median, pa, pm in zip(
+            rows, avgs.tolist(), medians.tolist(), pct_avg, pct_median
+        ):
+            if not p_type:
+                # Untyped listings keep the raw benchmark values, as get_type_adjusted_avg does
+                adj_avg, adj_median = stats.avg_price, stats.median_price
+            result = _market_result(price, suburb, p_type, stats, adj_avg, adj_median, pa, pm)
+            listing["market_value"] = _result_dict(result)
     return listings
 
 
@@ -345,8 +454,7 @@ def score_listings_batch(listings: list[dict]) -> list[dict]:
 def get_all_suburb_benchmarks() -> dict[str, dict]:
     """Return a summary of all suburbs for dashboard heatmap consumption."""
     result = {}
-    for suburb_key in FORMAL_LISTINGS_DB:
-        stats = compute_stats(FORMAL_LISTINGS_DB[suburb_key], suburb_key.title())
+    for suburb_key, stats in _STATS_CACHE.items():
         result[suburb_key.title()] = {
             "avg_price": stats.avg_price,
             "median_price": stats.median_price,
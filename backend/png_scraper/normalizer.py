@@ -9,7 +9,7 @@ Install: pip install phonenumbers
 
 import re
 import json
-import math
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass, asdict
 
@@ -73,17 +73,32 @@ SUBURB_ALIASES: dict[str, str] = {
     "june valley": "June Valley",
 }
 
+PROPERTY_TYPE_KEYWORDS: list[tuple[tuple[str, ...], str]] = [
+    (("house", "home", "bungalow", "dwelling"), "House"),
+    (("flat", "apartment", "apt", "unit"), "Apartment"),
+    (("studio",), "Studio"),
+    (("townhouse", "town house", "villa"), "Townhouse"),
+    (("room", "bedsit", "single room"), "Room"),
+    (("land", "block", "plot", "allotment"), "Land"),
+    (("commercial", "office", "shop", "warehouse"), "Commercial"),
+    (("compound", "complex"), "Compound"),
+]
+
 PROPERTY_TYPE_PATTERNS: list[tuple[str, str]] = [
-    (r"\b(house|home|bungalow|dwelling)\b", "House"),
-    (r"\b(flat|apartment|apt|unit)\b", "Apartment"),
-    (r"\b(studio)\b", "Studio"),
-    (r"\b(townhouse|town house|villa)\b", "Townhouse"),
-    (r"\b(room|bedsit|single room)\b", "Room"),
-    (r"\b(land|block|plot|allotment)\b", "Land"),
-    (r"\b(commercial|office|shop|warehouse)\b", "Commercial"),
-    (r"\b(compound|complex)\b", "Compound"),
+    (r"\b(" + "|".join(map(re.escape, _kws)) + r")\b", _label) for _kws, _label in PROPERTY_TYPE_KEYWORDS
 ]
 
+# Every suburb alias and property-type keyword in one alternation, scanned once per text.
+# The lookahead reports a hit at each start position, so overlapping names ("east boroko"
+# / "boroko") are all seen; alternatives are in priority order and the lowest rank wins.
+_KEYWORDS: dict[str, tuple[str, int, str]] = {}
+for _rank, (_alias, _canonical) in enumerate(SUBURB_ALIASES.items()):
+    _KEYWORDS.setdefault(_alias, ("suburb", _rank, _canonical))
+for _rank, (_kws, _label) in enumerate(PROPERTY_TYPE_KEYWORDS):
+    for _kw in _kws:
+        _KEYWORDS.setdefault(_kw, ("type", _rank, _label))
+_KEYWORD_RE = re.compile(r"(?=\b(" + "|".join(re.escape(k) for k in _KEYWORDS) + r")\b)")
+
 # Middleman indicator keywords
 MIDDLEMAN_KEYWORDS = [
     "agent", "real estate agent", "commission", "finder", "finder's fee",
@@ -130,7 +145,7 @@ PRICE_PERIOD_MULTIPLIERS = {
 # DATA MODEL
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedListing:
     price_pgk_monthly: Optional[int]
     price_raw: str
@@ -153,7 +168,25 @@ class NormalizedListing:
 # PRICE PARSING
 # ---------------------------------------------------------------------------
 
-def parse_price(text: str) -> tuple[Optional[int], str, str]:
+# Both run on lowercased text, so no IGNORECASE: that keeps re's literal-prefix scan.
+# Pattern: optional K prefix, digits, optional K suffix, optional period
+_PRICE_RE = re.compile(
+    r"(?:k\s*)?(\d+(?:\.\d+)?)\s*k?\s*"           # amount (e.g. 1500, 1500k)
+    r"(?:"
+    r"\s*(?:per|a|p|/|-)\s*"                        # separator
+    r"(day|daily|week|weekly|wk|w|fortnight|fn|month|monthly|mo|mth|m|year|yearly|annual|pa|p\.a)"
+    r")?"
+)
+
+# Also match K-prefixed patterns: K2500/month, K 1200 per week
+_K_PRICE_RE = re.compile(
+    r"k\s*(\d[\d,]*(?:\.\d+)?)"                    # K followed by number
+    r"(?:\s*(?:per|a|p|/|-)\s*"
+    r"(day|daily|week|weekly|wk|w|fortnight|fn|month|monthly|mo|mth|m|year|yearly|annual|pa|p\.a)"
+    r")?"
+)
+
+def parse_price(text: str, text_lower: Optional[str] = None) -> tuple[Optional[int], str, str]:
     """
     Returns (price_monthly_pgk, price_raw_match, confidence).
 
@@ -166,35 +199,16 @@ def parse_price(text: str) -> tuple[Optional[int], str, str]:
         "2000K monthly"         → 2000
         "asking 800 per week"   → 3467
     """
-    # Normalize text
-    t = text.lower()
-    t = t.replace(",", "").replace("pgk", "k").replace("kina", "k").replace("png kina", "k")
-
-    # Pattern: optional K prefix, digits, optional K suffix, optional period
-    # Groups: (prefix_k)(amount)(suffix_k)(period)
-    pattern = re.compile(
-        r"(?:k\s*)?(\d+(?:\.\d+)?)\s*k?\s*"           # amount (e.g. 1500, 1500k)
-        r"(?:"
-        r"\s*(?:per|a|p|/|-)\s*"                        # separator
-        r"(day|daily|week|weekly|wk|w|fortnight|fn|month|monthly|mo|mth|m|year|yearly|annual|pa|p\.a)"
-        r")?",
-        re.IGNORECASE
-    )
-
-    # Also match K-prefixed patterns: K2500/month, K 1200 per week
-    k_prefix_pattern = re.compile(
-        r"k\s*(\d[\d,]*(?:\.\d+)?)"                    # K followed by number
-        r"(?:\s*(?:per|a|p|/|-)\s*"
-        r"(day|daily|week|weekly|wk|w|fortnight|fn|month|monthly|mo|mth|m|year|yearly|annual|pa|p\.a)"
-        r")?",
-        re.IGNORECASE
-    )
+    # Normalize text ("png kina" is covered once "kina" becomes "k")
+    t = (text.lower() if text_lower is None else text_lower).replace(",", "").replace("pgk", "k").replace("kina", "k")
 
     best_price = None
     best_raw = ""
     confidence = "low"
 
-    for rx in [k_prefix_pattern, pattern]:
+    # K-prefixed matches first. The first valid match with an explicit period
+    # wins outright; otherwise the first valid match without one.
+    for rx in (_K_PRICE_RE, _PRICE_RE):
         for m in rx.finditer(t):
             raw_num = m.group(1).replace(",", "")
             try:
@@ -206,29 +220,18 @@ def parse_price(text: str) -> tuple[Optional[int], str, str]:
             if amount < 50 or amount > 500_000:
                 continue
 
-            period = m.group(2).lower() if m.group(2) else None
-            raw_match = m.group(0)
-
+            period = m.group(2)
             if period:
                 multiplier = PRICE_PERIOD_MULTIPLIERS.get(period, 1)
                 monthly = amount * multiplier
-                conf = "high"
-            else:
-                # No period found — heuristic: if <= 2000, likely weekly; else monthly
-                if amount <= 2000:
-                    monthly = amount * 4.333
-                    conf = "medium"
-                else:
-                    monthly = amount
-                    conf = "medium"
-
-            monthly_int = int(round(monthly))
+                return int(round(monthly)), m.group(0).strip(), "high"
 
-            # Prefer the match with an explicit period
-            if best_price is None or (period and confidence != "high"):
-                best_price = monthly_int
-                best_raw = raw_match.strip()
-                confidence = conf
+            if best_price is None:
+                # No period found — heuristic: if <= 2000, likely weekly; else monthly
+                monthly = amount * 4.333 if amount <= 2000 else amount
+                best_price = int(round(monthly))
+                best_raw = m.group(0).strip()
+                confidence = "medium"
 
     return best_price, best_raw, confidence
 
@@ -237,30 +240,40 @@ def parse_price(text: str) -> tuple[Optional[int], str, str]:
 # LOCATION PARSING
 # ---------------------------------------------------------------------------
 
-def parse_location(text: str) -> tuple[Optional[str], Optional[str]]:
-    """Returns (raw_location_phrase, canonical_suburb)."""
-    text_lower = text.lower()
+def _match_keywords(text_lower: str) -> tuple[Optional[str], Optional[str]]:
+    """Returns (canonical_suburb, property_type) from a single scan of lowercased text."""
+    best = {}
+    for m in _KEYWORD_RE.finditer(text_lower):
+        kind, rank, label = _KEYWORDS[m.group(1)]
+        if kind not in best or rank < best[kind][0]:
+            best[kind] = (rank, label)
+    return (best["suburb"][1] if "suburb" in best else None,
+            best["type"][1] if "type" in best else None)
+
 
-    found_suburb = None
-    for alias, canonical in SUBURB_ALIASES.items():
-        if re.search(r'\b' + re.escape(alias) + r'\b', text_lower):
-            found_suburb = canonical
-            break
+# Location phrase around any alias, built once instead of re-joined on every call.
+# Longest aliases first so "eight mile" wins over "mile"; callers pass lowercased text.
+_ALIAS_ALTERNATION = '|'.join(sorted((re.escape(a) for a in SUBURB_ALIASES), key=len, reverse=True))
+_LOCATION_RE = re.compile(
+    r'(?:in|at|located|location[:\s]+)?\s*'
+    r'(?:' + _ALIAS_ALTERNATION + r')'
+    r'(?:\s*,\s*[a-z ]+)?'
+)
 
+
+def _location_phrase(text_lower: str, found_suburb: Optional[str]) -> Optional[str]:
     # Try to extract a location phrase around the suburb
     if found_suburb:
-        pattern = re.compile(
-            r'(?:in|at|located|location[:\s]+)?\s*'
-            r'(?:' + '|'.join(re.escape(a) for a in SUBURB_ALIASES) + r')'
-            r'(?:\s*,\s*[a-z ]+)?',
-            re.IGNORECASE
-        )
-        m = pattern.search(text_lower)
-        raw_loc = m.group(0).strip() if m else found_suburb
-    else:
-        raw_loc = None
+        m = _LOCATION_RE.search(text_lower)
+        return m.group(0).strip() if m else found_suburb
+    return None
 
-    return raw_loc, found_suburb
+
+def parse_location(text: str) -> tuple[Optional[str], Optional[str]]:
+    """Returns (raw_location_phrase, canonical_suburb)."""
+    text_lower = text.lower()
+    found_suburb = _match_keywords(text_lower)[0]
+    return _location_phrase(text_lower, found_suburb), found_suburb
 
 
 # ---------------------------------------------------------------------------
@@ -268,39 +281,38 @@ def parse_location(text: str) -> tuple[Optional[str], Optional[str]]:
 # ---------------------------------------------------------------------------
 
 def parse_property_type(text: str) -> Optional[str]:
-    text_lower = text.lower()
-    for pattern, label in PROPERTY_TYPE_PATTERNS:
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            return label
-    return None
+    return _match_keywords(text.lower())[1]
 
 
 # ---------------------------------------------------------------------------
 # BEDROOMS PARSING
 # ---------------------------------------------------------------------------
 
-def parse_bedrooms(text: str) -> Optional[int]:
-    patterns = [
-        r'(\d+)\s*(?:-bed|bed|bedroom|br|bdrm|b/r)s?',
-        r'(\d+)\s*(?:x|X)\s*(?:bed|bedroom|br|bdrm|b/r)s?',
-        r'(?:bed|bedroom|br|bdrm|b/r)s?\s*[:\-]?\s*(\d+)',
-        r'(?:rooms|beds)\s*[:\-]?\s*(\d+)',
-        r'(\d+)\s*b/r',
-        r'(\d+)\s*b/r',
-    ]
-    for p in patterns:
-        m = re.search(p, text, re.IGNORECASE)
+# Tried in priority order against lowercased text; compiled once, without IGNORECASE
+_BEDROOM_PATTERNS = [re.compile(p) for p in (
+    r'(\d+)\s*(?:-bed|bed|bedroom|br|bdrm|b/r)s?',
+    r'(\d+)\s*x\s*(?:bed|bedroom|br|bdrm|b/r)s?',
+    r'(?:bed|bedroom|br|bdrm|b/r)s?\s*[:\-]?\s*(\d+)',
+    r'(?:rooms|beds)\s*[:\-]?\s*(\d+)',
+    r'(\d+)\s*b/r',
+)]
+
+def parse_bedrooms(text: str, text_lower: Optional[str] = None) -> Optional[int]:
+    text = text.lower() if text_lower is None else text_lower
+    for rx in _BEDROOM_PATTERNS:
+        m = rx.search(text)
         if m:
             n = int(m.group(1))
             if 1 <= n <= 20:
                 return n
     return None
 
-def parse_sqm(text: str) -> Optional[float]:
+_SQM_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:sqm|sq\.m|m2|m²|square\s*meters?|sqr\s*mtrs?)')
+
+def parse_sqm(text: str, text_lower: Optional[str] = None) -> Optional[float]:
     # Normalize commas in numbers before parsing or use a better regex
-    t_clean = text.replace(',', '')
-    pattern = r'(\d+(?:\.\d+)?)\s*(?:sqm|sq\.m|m2|m²|square\s*meters?|sqr\s*mtrs?)'
-    m = re.search(pattern, t_clean, re.IGNORECASE)
+    t_clean = (text.lower() if text_lower is None else text_lower).replace(',', '')
+    m = _SQM_RE.search(t_clean)
     if m:
         try:
             val = float(m.group(1))
@@ -309,8 +321,8 @@ def parse_sqm(text: str) -> Optional[float]:
             return None
     return None
 
-def parse_is_sale(text: str) -> bool:
-    t = text.lower()
+def parse_is_sale(text: str, text_lower: Optional[str] = None) -> bool:
+    t = text.lower() if text_lower is None else text_lower
     if any(kw in t for kw in ["for sale", "selling", "/sale/", "price on application", "poa"]):
         if any(kw in t for kw in ["for rent", "to let", "/rent/"]):
             # ambiguous, but "sale" is often more specific if mentioned
@@ -322,38 +334,46 @@ def parse_is_sale(text: str) -> bool:
 # CONTACT INFO PARSING
 # ---------------------------------------------------------------------------
 
+# PNG phone patterns: 7xxx xxxx (mobile), 3xx xxxx (landline), +675...
+# Each carries a substring every match must contain, checked before running the regex
+_PHONE_PATTERNS = [(needle, re.compile(p)) for needle, p in (
+    ("675", r'\+675[\s\-]?\d{3,4}[\s\-]?\d{3,4}'),
+    ("675", r'\b675[\s\-]?\d{3,4}[\s\-]?\d{3,4}\b'),
+    ("7",   r'\b7\d{3}[\s\-]?\d{4}\b'),          # PNG mobile: 7xxx xxxx
+    ("3",   r'\b3\d{2}[\s\-]?\d{4}\b'),          # PNG landline
+)]
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}')
+
+@lru_cache(maxsize=4096)
+def _validate_phone(raw: str) -> Optional[str]:
+    # Agency numbers repeat across listings, so each distinct raw match is parsed once
+    try:
+        parsed = phonenumbers.parse(raw, "PG")
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+    except Exception:
+        return raw.strip()
+    return None
+
 def parse_contact_info(text: str) -> dict:
     phones = []
     emails = []
 
-    # PNG phone patterns: 7xxx xxxx (mobile), 3xx xxxx (landline), +675...
-    phone_patterns = [
-        r'\+675[\s\-]?\d{3,4}[\s\-]?\d{3,4}',
-        r'\b675[\s\-]?\d{3,4}[\s\-]?\d{3,4}\b',
-        r'\b7\d{3}[\s\-]?\d{4}\b',          # PNG mobile: 7xxx xxxx
-        r'\b3\d{2}[\s\-]?\d{4}\b',          # PNG landline
-    ]
-    for p in phone_patterns:
-        phones.extend(re.findall(p, text))
+    for needle, rx in _PHONE_PATTERNS:
+        if needle in text:
+            phones.extend(rx.findall(text))
 
+    # Dedup before validating: the same number often appears several times in a post
+    phones = list(dict.fromkeys(phones))
     if HAS_PHONENUMBERS:
-        validated = []
-        for raw in phones:
-            try:
-                parsed = phonenumbers.parse(raw, "PG")
-                if phonenumbers.is_valid_number(parsed):
-                    validated.append(phonenumbers.format_number(
-                        parsed, phonenumbers.PhoneNumberFormat.INTERNATIONAL
-                    ))
-            except Exception:
-                validated.append(raw.strip())
-        phones = list(dict.fromkeys(validated))  # dedup, preserve order
+        validated = (_validate_phone(raw) for raw in phones)
+        phones = list(dict.fromkeys(p for p in validated if p is not None))  # dedup, preserve order
     else:
         phones = list(dict.fromkeys(p.strip() for p in phones))
 
     # Emails
-    email_pattern = r'[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}'
-    emails = list(dict.fromkeys(re.findall(email_pattern, text)))
+    if "@" in text:
+        emails = list(dict.fromkeys(_EMAIL_RE.findall(text)))
 
     return {"phones": phones, "emails": emails}
 
@@ -362,27 +382,28 @@ def parse_contact_info(text: str) -> dict:
 # MIDDLEMAN DETECTION
 # ---------------------------------------------------------------------------
 
-def detect_middleman(text: str) -> tuple[bool, list[str]]:
-    text_lower = text.lower()
+def detect_middleman(text: str, text_lower: Optional[str] = None) -> tuple[bool, list[str]]:
+    if text_lower is None:
+        text_lower = text.lower()
     flags = [kw for kw in MIDDLEMAN_KEYWORDS if kw in text_lower]
     return len(flags) > 0, flags
 
+# Each label's patterns fused into one alternation: one search per label, not per pattern
+_TITLE_RES = [(status, re.compile("|".join(ps))) for status, ps in TITLE_PATTERNS.items()]
+_LEGAL_RES = [(label, re.compile("|".join(ps))) for label, ps in LEGAL_WARNINGS.items()]
+
 def classify_title_status(text: str) -> str:
     """Identify if the land is State Lease, Customary, or Unknown."""
     t = text.lower()
-    for status, patterns in TITLE_PATTERNS.items():
-        if any(re.search(p, t) for p in patterns):
+    for status, rx in _TITLE_RES:
+        if rx.search(t):
             return status
     return "Unknown / TBC"
 
 def detect_legal_flags(text: str) -> list[str]:
     """Detect red flags related to land disputes or missing paperwork."""
     t = text.lower()
-    flags = []
-    for label, patterns in LEGAL_WARNINGS.items():
-        if any(re.search(p, t) for p in patterns):
-            flags.append(label)
-    return flags
+    return [label for label, rx in _LEGAL_RES if rx.search(t)]
 
 # ---------------------------------------------------------------------------
 # MAIN NORMALIZER
@@ -428,6 +449,38 @@ def check_verification(contacts: dict) -> bool:
 
     return False
 
+def _normalize_core(raw_text: str, text_lower: str) -> dict:
+    price_monthly, price_raw, price_confidence = parse_price(raw_text, text_lower)
+    suburb, property_type = _match_keywords(text_lower)
+    bedrooms = parse_bedrooms(raw_text, text_lower)
+    sqm = parse_sqm(raw_text, text_lower)
+    contact_info = parse_contact_info(raw_text)
+
+    return {
+        "price_pgk_monthly": price_monthly,
+        "price_raw": price_raw,
+        "price_confidence": price_confidence,
+        "suburb": suburb,
+        "property_type": property_type,
+        "bedrooms": bedrooms,
+        "sqm": sqm,
+        "contact_info": contact_info,
+        "health_score": calculate_health_score(
+            price_monthly, suburb, property_type, bedrooms, sqm, contact_info, raw_text
+        ),
+        "is_verified": check_verification(contact_info),
+    }
+
+def normalize_listing_fields(raw_text: str) -> dict:
+    """
+    Reduced normalize() for scraper ingestion (engine.make_listing).
+
+    Same values as normalize() for price, suburb, type, bedrooms, sqm, contacts,
+    health and verification; skips the location phrase, sale/middleman flags
+    and the dataclass round trip, which the scraped Listing does not store.
+    """
+    return _normalize_core(raw_text, raw_text.lower())
+
 def normalize(raw_text: str) -> dict:
     """
     Core normalization function with Trust & Verification enhancements.
@@ -435,35 +488,17 @@ def normalize(raw_text: str) -> dict:
     Input : raw string from Facebook post or scraped listing.
     Output: structured dict ready for MongoDB insertion.
     """
-    price_monthly, price_raw, price_confidence = parse_price(raw_text)
-    location_raw, suburb = parse_location(raw_text)
-    property_type = parse_property_type(raw_text)
-    bedrooms = parse_bedrooms(raw_text)
-    sqm = parse_sqm(raw_text)
-    is_sale = parse_is_sale(raw_text)
-    contact_info = parse_contact_info(raw_text)
-    is_middleman, middleman_flags = detect_middleman(raw_text)
-
-    health_score = calculate_health_score(
-        price_monthly, suburb, property_type, bedrooms, sqm, contact_info, raw_text
-    )
-    is_verified = check_verification(contact_info)
+    # Lowercase once; every keyword/pattern helper below shares it
+    text_lower = raw_text.lower()
+    core = _normalize_core(raw_text, text_lower)
+    is_middleman, middleman_flags = detect_middleman(raw_text, text_lower)
 
     listing = NormalizedListing(
-        price_pgk_monthly=price_monthly,
-        price_raw=price_raw,
-        price_confidence=price_confidence,
-        location=location_raw,
-        suburb=suburb,
-        property_type=property_type,
-        bedrooms=bedrooms,
-        sqm=sqm,
-        is_for_sale=is_sale,
-        contact_info=contact_info,
+        **core,
+        location=_location_phrase(text_lower, core["suburb"]),
+        is_for_sale=parse_is_sale(raw_text, text_lower),
         is_middleman=is_middleman,
         middleman_flags=middleman_flags,
-        health_score=health_score,
-        is_verified=is_verified,
         source_text=raw_text[:500],   # truncate for storage
     )
     return asdict(listing)
@@ -8,7 +8,7 @@ Handles:
 • Login popup — two-stage: close without login → fallback to credential login
 • Session persistence (avoids frequent re-logins → reduces ban risk)
 • Auto-scroll with human-like cadence
-• Checkpoint / 2FA detection
+• Checkpoint / 2FA detection (TOTP auto-fill when FB_TOTP_SECRET is set)
 • Rate-limit backoff
 """
 
@@ -23,14 +23,26 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+try:
+    # Authenticator-app codes for the 2FA checkpoint (FB_TOTP_SECRET)
+    import pyotp
+    HAS_PYOTP = True
+except ImportError:
+    HAS_PYOTP = False
+
 from png_scraper.engine import (
     PNGScraper,
+    any_of,
     Listing,
     make_listing,
+    make_listing_id,
     sleep_human,
     scroll_page,
     move_mouse,
     type_human,
+    block_heavy_resources,
+    launch_browser,
+    new_persistent_context,
     new_stealth_context,
 )
 
@@ -40,10 +52,17 @@ SOURCE_SITE   = "Facebook Marketplace"
 MARKETPLACE_URL = "https://www.facebook.com/marketplace/category/propertyrentals"
 LOGIN_URL       = "https://www.facebook.com/login"
 SESSION_FILE    = Path(os.getenv("FB_SESSION_PATH", (Path(__file__).parent.parent.parent.parent / "data" / "fb_session.json").resolve()))
+# Optional full Chromium profile directory; when set it is used instead of a fresh context
+PROFILE_DIR     = os.getenv("FB_PROFILE_DIR", "")
 
 # Load FB credentials from environment (set in .env or CI secrets — never hardcode)
 FB_EMAIL    = os.getenv("FB_EMAIL", "")
 FB_PASSWORD = os.getenv("FB_PASSWORD", "")
+# Base32 secret behind the account's authenticator app; lets 2FA complete unattended
+FB_TOTP_SECRET = os.getenv("FB_TOTP_SECRET", "")
+
+# Scroll rounds in a row with no new cards before the feed counts as exhausted
+_MAX_STALE_ROUNDS = 2
 
 # ── login wall handlers ───────────────────────────────────────────────────────
 
@@ -60,6 +79,18 @@ _WALL_DETECTORS = [
     "input#email",
 ]
 
+_COOKIE_ACCEPT_SELECTORS = [
+    "[data-cookiebanner='accept_button']",
+    "[title='Accept all']",
+    "button:has-text('Accept All')",
+    "button:has-text('Allow all cookies')",
+]
+
+# One selector group per dialog: a single visibility wait instead of one per
+# alternative (absent popup: 2.5s worst case, not 4 × 2.5s)
+_CLOSE_ANY  = any_of(_CLOSE_SELECTORS)
+_COOKIE_ANY = any_of(_COOKIE_ACCEPT_SELECTORS)
+
 
 async def _dismiss_popup_no_login(page) -> bool:
     """
@@ -68,17 +99,16 @@ async def _dismiss_popup_no_login(page) -> bool:
     Returns True if successfully dismissed.
     """
     # Try close button
-    for sel in _CLOSE_SELECTORS:
-        try:
-            btn = page.locator(sel).first
-            if await btn.is_visible(timeout=2_500):
-                await sleep_human(0.4, 1.0)
-                await btn.click()
-                await sleep_human(0.8, 1.5)
-                log.info("[FB] Login popup closed (no-login)")
-                return True
-        except Exception:
-            pass
+    try:
+        btn = page.locator(_CLOSE_ANY).first
+        await btn.wait_for(state="visible", timeout=2_500)
+        await sleep_human(0.4, 1.0)
+        await btn.click()
+        await sleep_human(0.8, 1.5)
+        log.info("[FB] Login popup closed (no-login)")
+        return True
+    except Exception:
+        pass
 
     # Try Escape key
     try:
@@ -114,20 +144,13 @@ async def _login_with_credentials(page, email: str, password: str) -> bool:
         await move_mouse(page)
 
         # Accept cookie consent if present
-        for cookie_sel in [
-            "[data-cookiebanner='accept_button']",
-            "[title='Accept all']",
-            "button:has-text('Accept All')",
-            "button:has-text('Allow all cookies')",
-        ]:
-            try:
-                btn = page.locator(cookie_sel).first
-                if await btn.is_visible(timeout=2_000):
-                    await btn.click()
-                    await sleep_human(0.5, 1.2)
-                    break
-            except Exception:
-                pass
+        try:
+            btn = page.locator(_COOKIE_ANY).first
+            await btn.wait_for(state="visible", timeout=2_000)
+            await btn.click()
+            await sleep_human(0.5, 1.2)
+        except Exception:
+            pass
 
         # Type credentials with human cadence
         await type_human(page, "#email", email)
@@ -142,9 +165,15 @@ async def _login_with_credentials(page, email: str, password: str) -> bool:
         # Checkpoint / 2FA detection
         if "checkpoint" in page.url or "two_step" in page.url or "two-factor" in page.url:
             log.warning("[FB] ⚠️  2FA checkpoint detected!")
-            if sys.stdin.isatty():
+            if FB_TOTP_SECRET and HAS_PYOTP:
+                await type_human(page, "input[name='approvals_code']", pyotp.TOTP(FB_TOTP_SECRET).now())
+                await page.click("#checkpointSubmitButton, button[type='submit']")
+                await sleep_human(3.0, 5.0)
+                log.info("[FB] 2FA code submitted")
+            elif sys.stdin.isatty():
                 log.warning("[FB]     Complete 2FA in the browser, then press ENTER.")
-                input(">> Press ENTER after completing 2FA: ")
+                # In a thread: a bare input() would stall every other scraper on the loop
+                await asyncio.to_thread(input, ">> Press ENTER after completing 2FA: ")
                 await sleep_human(2.0, 4.0)
             else:
                 log.error("[FB] ❌ Non-interactive shell — cannot complete 2FA checkpoint.")
@@ -196,28 +225,54 @@ _TEXT_SELECTORS = [
 ]
 
 
-async def _parse_marketplace_card(card) -> Optional[dict]:
-    """Extract raw fields from one Marketplace listing card."""
-    texts: list[str] = []
-    for sel in _TEXT_SELECTORS:
-        els = await card.query_selector_all(sel)
-        for el in els:
-            try:
-                t = (await el.inner_text()).strip()
-                if t and t not in texts and len(t) < 300:
-                    texts.append(t)
-            except Exception:
-                pass
+# Collects every card's texts and link in one evaluate() instead of a CDP round-trip
+# per text element. Same rules as before: unique trimmed texts under 300 chars, in
+# _TEXT_SELECTORS order; href from the item link, else any link.
+# Cards already returned on an earlier scroll round (same selector, link and first
+# text, i.e. the same listing id) are counted but not sent back, so each round only
+# ships and parses the newly loaded part of the feed.
+# The selector cascade runs in the page too, one round-trip per round: stop at the
+# first selector with matches once the feed has yielded anything, otherwise at the
+# first one that produces fresh cards. (A CSS union is not used: the fallbacks match
+# wrappers and nested links of the primary cards.)
+_CARDS_JS = """
+({cardSels, textSels, haveAny}) => {
+    const seen = window.__pngSeenCards || (window.__pngSeenCards = new Set());
+    const fresh = [];
+    let total = 0;
+    for (const cardSel of cardSels) {
+        const cards = document.querySelectorAll(cardSel);
+        if (!cards.length) continue;
+        total += cards.length;
+        for (const card of cards) {
+            try {
+                const texts = [];
+                for (const s of textSels) {
+                    for (const el of card.querySelectorAll(s)) {
+                        const t = (el.innerText || "").trim();
+                        if (t && !texts.includes(t) && t.length < 300) texts.push(t);
+                    }
+                }
+                const link = card.querySelector("a[href*='/marketplace/item/']") || card.querySelector("a[href]");
+                const href = link ? (link.getAttribute("href") || "").trim() : "";
+                if (!texts.length && !href) continue;
+                const key = cardSel + "\\n" + href + "\\n" + (texts[0] || "");
+                if (seen.has(key)) continue;
+                seen.add(key);
+                fresh.push({texts, href});
+            } catch (e) {}
+        }
+        if (haveAny || fresh.length) break;
+    }
+    return {total, fresh};
+}
+"""
 
-    href = ""
-    try:
-        link = await card.query_selector("a[href*='/marketplace/item/']")
-        if not link:
-            link = await card.query_selector("a[href]")
-        if link:
-            href = (await link.get_attribute("href") or "").strip()
-    except Exception:
-        pass
+
+def _parse_marketplace_card(card: dict) -> Optional[dict]:
+    """Shape the raw texts/href extracted for one Marketplace listing card."""
+    texts: list[str] = card["texts"]
+    href: str = card["href"]
 
     if not texts and not href:
         return None
@@ -259,46 +314,64 @@ class FacebookScraper(PNGScraper):
         headless: bool = True,
         email: str = FB_EMAIL,
         password: str = FB_PASSWORD,
+        block_resources: bool = True,
+        max_listings: int = 500,
+        profile_dir: str = PROFILE_DIR,
+        stealth_level: str = "high",
     ):
-        super().__init__(headless)
+        super().__init__(headless, stealth_level)
         self.scroll_rounds = scroll_rounds
+        self.max_listings  = max_listings
+        self.profile_dir   = profile_dir
         self.email    = email
         self.password = password
+        # Routing disables the HTTP cache; turn off if a warm cache ever matters more
+        self.block_resources = block_resources
 
-    async def run(self, on_progress: Optional[Callable[[int, int], Any]] = None) -> list[Listing]:
+    async def run(self, on_progress: Optional[Callable[[int, int], Any]] = None, pw=None, browser=None) -> list[Listing]:
         """Override run() to inject saved session into context."""
-        from playwright.async_api import async_playwright
-        log.info(f"[FB] Starting scraper (headless={self.headless})")
-        results: list[Listing] = []
-
-        async with async_playwright() as pw:
+        if browser is None:
+            if pw is None:
+                from playwright.async_api import async_playwright
+                async with async_playwright() as pw:
+                    return await self.run(on_progress, pw=pw)
             try:
-                browser, context = await asyncio.wait_for(
-                    new_stealth_context(pw, self.headless, session_file=SESSION_FILE),
-                    timeout=60
-                )
+                browser = await asyncio.wait_for(launch_browser(pw, self.headless), timeout=60)
             except asyncio.TimeoutError:
                 log.error("[FB] Browser launch timed out")
                 return []
+            try: return await self.run(on_progress, browser=browser)
+            finally: await browser.close()
 
+        log.info(f"[FB] Starting scraper (headless={self.headless})")
+        results: list[Listing] = []
+        if self.profile_dir:
+            # Its own Chromium process: a persistent profile cannot live in a shared browser
+            context = await new_persistent_context(browser.browser_type, self.profile_dir, self.headless, session_file=SESSION_FILE)
+        else:
+            context = await new_stealth_context(browser, session_file=SESSION_FILE)
+
+        try:
+            if self.block_resources:
+                # Card photos/videos dominate each scroll round; texts and links are all we read
+                await block_heavy_resources(context)
+            self._page = await context.new_page()
+            results = await asyncio.wait_for(
+                self.scrape(context, on_progress=on_progress),
+                timeout=300
+            )
+            log.info(f"[FB] ✓ Collected {len(results)} listings")
+        except asyncio.TimeoutError:
+            log.error("[FB] Scrape timed out after 300s")
+        except Exception as exc:
+            log.error(f"[FB] Fatal: {exc}", exc_info=True)
+        finally:
+            # Always persist session on exit (the JSON stays portable across machines)
             try:
-                self._page = await context.new_page()
-                results = await asyncio.wait_for(
-                    self.scrape(context, on_progress=on_progress),
-                    timeout=300
-                )
-                log.info(f"[FB] ✓ Collected {len(results)} listings")
-            except asyncio.TimeoutError:
-                log.error("[FB] Scrape timed out after 300s")
-            except Exception as exc:
-                log.error(f"[FB] Fatal: {exc}", exc_info=True)
-            finally:
-                # Always persist session on exit
-                try:
-                    await context.storage_state(path=str(SESSION_FILE))
-                except Exception:
-                    pass
-                await browser.close()
+                await context.storage_state(path=str(SESSION_FILE))
+            except Exception:
+                pass
+            await context.close()
         return results
 
     async def scrape(self, context, on_progress=None) -> list[Listing]:
@@ -329,47 +402,59 @@ class FacebookScraper(PNGScraper):
         # ── Phase 3: auto-scroll + extract ───────────────────────────────────
         log.info(f"[FB] Scrolling {self.scroll_rounds} rounds to load Marketplace feed")
 
+        stale = 0  # consecutive rounds that added nothing
         for round_num in range(1, self.scroll_rounds + 1):
             log.info(f"[FB] Scroll round {round_num}/{self.scroll_rounds}")
-            await move_mouse(page)
+            if self.stealth_level == "high":
+                await move_mouse(page)
             await scroll_page(page, scrolls=random.randint(3, 6))
-            await sleep_human(2.0, 4.5)
+            # Back off while the feed is stalled: give lazy loading time to catch up
+            if self.stealth_level != "low" or stale:
+                await sleep_human(2.0 * 2 ** stale, 4.5 * 2 ** stale)
 
             # Collect cards visible so far
             new_count = 0
-            for sel in _CARD_SELECTORS:
-                try:
-                    cards = await page.query_selector_all(sel)
-                    if not cards:
+            try:
+                found = await page.evaluate(_CARDS_JS, {
+                    "cardSels": _CARD_SELECTORS, "textSels": _TEXT_SELECTORS, "haveAny": bool(results),
+                })
+                # Shape the whole batch synchronously, then dedup and build
+                raws = [r for r in map(_parse_marketplace_card, found["fresh"]) if r]
+                for raw in raws:
+                    # Dedup on the id before building the Listing: repeats skip the normalizer
+                    lid = make_listing_id(raw["url"], raw["price_raw"])
+                    if lid in seen_ids:
                         continue
-                    for card in cards:
-                        raw = await _parse_marketplace_card(card)
-                        if not raw:
-                            continue
-                        listing = make_listing(
-                            source_site = SOURCE_SITE,
-                            title       = raw["description"] or raw["price_raw"] or "FB Marketplace Rental",
-                            price_raw   = raw["price_raw"],
-                            location    = raw["location"],
-                            listing_url = raw["url"],
-                            is_verified = False,
-                            raw_text    = raw["all_texts"],
-                        )
-                        if listing.listing_id not in seen_ids:
-                            seen_ids.add(listing.listing_id)
-                            results.append(listing)
-                            new_count += 1
-                    if results:
-                        break
-                except Exception as e:
-                    log.debug(f"[FB] Selector error: {e}")
+                    seen_ids.add(lid)
+                    listing = make_listing(
+                        source_site = SOURCE_SITE,
+                        title       = raw["description"] or raw["price_raw"] or "FB Marketplace Rental",
+                        price_raw   = raw["price_raw"],
+                        location    = raw["location"],
+                        listing_url = raw["url"],
+                        is_verified = False,
+                        raw_text    = raw["all_texts"],
+                    )
+                    results.append(listing)
+                    new_count += 1
+            except Exception as e:
+                log.debug(f"[FB] Card extraction error: {e}")
 
             log.info(f"[FB] Running total: {len(results)} unique listings")
             if on_progress:
                 on_progress(new_count, round_num)
 
+            # Stop once the feed stops growing, or at the listing cap
+            stale = 0 if new_count else stale + 1
+            if stale >= _MAX_STALE_ROUNDS:
+                log.info(f"[FB] No new listings for {stale} rounds — feed exhausted")
+                break
+            if len(results) >= self.max_listings:
+                log.info(f"[FB] Reached {self.max_listings} listings — stopping")
+                break
+
             # Longer breaks every 3 rounds (human reading simulation)
-            if round_num % 3 == 0:
+            if round_num % 3 == 0 and self.stealth_level != "low":
                 pause = random.uniform(8.0, 18.0)
                 log.info(f"[FB] Taking a {pause:.0f}s reading break...")
                 await asyncio.sleep(pause)
@@ -11,13 +11,26 @@ import logging
 import random
 from dataclasses import dataclass
 from typing import Optional
+from urllib.parse import urlparse
 
 from png_scraper.engine import (
+    HAS_SELECTOLAX,
     PNGScraper,
+    any_of,
+    block_heavy_resources,
+    extract_cards,
+    has_visible,
+    html_cards,
+    html_has_next,
+    launch_browser,
     Listing,
     make_listing,
-    sleep_human,
+    make_listing_id,
+    random_ua,
+    new_http_client,
+    save_http_cookies,
     scroll_page,
+    sleep_human,
     move_mouse,
 )
 
@@ -105,9 +118,10 @@ class SiteConfig:
     card_selectors: list[str] = None
     extra_wait_ms:  int  = 2000
     needs_scroll:   bool = True
+    render:         str  = "browser"   # "http": plain GET + HTML parse, browser only as fallback
 
 AGENCY_CONFIGS: list[SiteConfig] = [
-    SiteConfig("The Professionals", "https://theprofessionals.com.pg/rent/", max_pages=5, card_selectors=["a.recent-listing"]),
+    SiteConfig("The Professionals", "https://theprofessionals.com.pg/rent/", max_pages=5, card_selectors=["a.recent-listing"], render="http"),
     SiteConfig("Marketmeri.com (Real Estate Section)", "https://marketmeri.com/real-estate", max_pages=8, card_selectors=[".listing-wrapper-grid"]),
     SiteConfig("Strickland Real Estate", "https://www.sre.com.pg/rentals", max_pages=5),
     SiteConfig("Century 21 Siule Real Estate", "https://www.century21.com.pg/rent/", max_pages=5),
@@ -125,53 +139,28 @@ AGENCY_CONFIGS: list[SiteConfig] = [
     SiteConfig("Edai Town Estate", "http://www.edaitown.com/price.html", max_pages=2),
 ]
 
-async def _first_text(el, selectors: list[str]) -> str:
-    for sel in selectors:
-        try:
-            child = await el.query_selector(sel)
-            if child:
-                t = (await child.inner_text()).strip()
-                if t: return t
-        except Exception: pass
-    return ""
+# Result pages rendered at once per site; pagination never runs past the batch that ends it
+PAGE_BATCH = 3
 
-async def _first_attr(el, selectors: list[str], attr: str) -> str:
-    try:
-        tag = await el.evaluate("el => el.tagName")
-        if tag == "A" and attr == "href":
-            v = (await el.get_attribute("href") or "").strip()
-            if v: return v
-    except: pass
+# Field cascades, shared by the browser (extract_cards) and static (html_cards) paths
+_FIELDS = {"title": GENERIC_TITLE, "price": GENERIC_PRICE, "location": GENERIC_LOCATION}
 
-    for sel in selectors:
-        try:
-            child = await el.query_selector(sel)
-            if child:
-                v = (await child.get_attribute(attr) or "").strip()
-                if v: return v
-        except Exception: pass
-    return ""
+def _card_url(href: str, base_url: str) -> str:
+    # base_url is always scheme://netloc (no trailing slash), built once per scrape
+    return href if href.startswith("http") else f"{base_url}/{href.lstrip('/')}"
 
-async def _parse_card(card, cfg: SiteConfig, base_url: str) -> Optional[Listing]:
-    title    = await _first_text(card, GENERIC_TITLE)
-    price_r  = await _first_text(card, GENERIC_PRICE)
-    location = await _first_text(card, GENERIC_LOCATION)
-    href     = await _first_attr(card, GENERIC_LINK, "href")
-
-    if not href:
-        try:
-            a = await card.query_selector("a[href]")
-            if a: href = (await a.get_attribute("href") or "").strip()
-        except Exception: pass
+def _card_id(raw: dict, base_url: str) -> Optional[str]:
+    # The listing_id make_listing would assign, without running the normalizer
+    return make_listing_id(_card_url(raw["href"], base_url), raw["price"]) if raw["href"] else None
 
+def _parse_card(raw: dict, cfg: SiteConfig, base_url: str) -> Optional[Listing]:
+    title, price_r, location, href = raw["title"], raw["price"], raw["location"], raw["href"]
     if not href: return None
 
-    url = href if href.startswith("http") else f"{base_url.rstrip('/')}/{href.lstrip('/')}"
+    url = _card_url(href, base_url)
     if not title:
         title = f"Property — {location}" if location else f"{cfg.source_site} Listing"
 
-    raw_text = await card.inner_text()
-
     return make_listing(
         source_site = cfg.source_site,
         title       = title,
@@ -179,101 +168,167 @@ async def _parse_card(card, cfg: SiteConfig, base_url: str) -> Optional[Listing]
         location    = location,
         listing_url = url,
         is_verified = cfg.is_verified,
-        raw_text    = f"{title} {price_r} {location} {raw_text}",
+        raw_text    = f"{title} {price_r} {location} {raw['text']}",
     )
 
+# Static path (SiteConfig.render == "http"): link texts standing in for :has-text()
+_NEXT_LINK_TEXTS = ("next", "›", ">>")
+
 class GeneralAgencyScraper(PNGScraper):
     IS_VERIFIED = True
+    STEALTH_LEVEL = "low"  # small brochure sites, no bot defences worth pacing for
 
-    def __init__(self, config: SiteConfig, headless: bool = True):
-        super().__init__(headless)
+    def __init__(self, config: SiteConfig, headless: bool = True, client=None):
+        super().__init__(headless, client=client)
         self.cfg = config
+        # URL pieces are fixed per site: build them once, not per page or card
+        parsed = urlparse(config.start_url)
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self._page_tpl = config.start_url.rstrip("/") + "/page/{}/"
         self.SOURCE_SITE = config.source_site
 
-    async def scrape(self, context, on_progress=None) -> list[Listing]:
-        page = self._page
-        cfg  = self.cfg
-        results: list[Listing] = []
-        seen_ids: set[str] = set()
+    # ── static path hooks (see PNGScraper._scrape_http) ──
+    def _static_urls(self) -> list[str]:
+        if self.cfg.render != "http": return []
+        return [self.cfg.start_url] + [self._page_tpl.format(n) for n in range(2, self.cfg.max_pages + 1)]
+
+    def _static_cards(self, tree) -> list[dict]:
+        sel, cards = html_cards(tree, self.cfg.card_selectors or GENERIC_CARD, _FIELDS, GENERIC_LINK)
+        if cards: log.info(f"[{self.cfg.source_site}] '{sel}' → {len(cards)} cards (static)")
+        return cards
+
+    def _static_has_next(self, tree) -> bool:
+        return html_has_next(tree, GENERIC_NEXT, _NEXT_LINK_TEXTS)
+
+    def _static_alt_url(self, page_num: int) -> str:
+        return f"{self.cfg.start_url}?page={page_num}"
+
+    def _card_id(self, raw: dict) -> Optional[str]:
+        return _card_id(raw, self.base_url)
+
+    def _build_listing(self, raw: dict) -> Optional[Listing]:
+        return _parse_card(raw, self.cfg, self.base_url)
+
+    async def _probe_pages(self, urls: list[str]) -> list[str]:
+        """
+        HEAD the pagination URLs and cut the list at the first page the server says
+        is missing (404/410, or redirected back to the first page), so it is never
+        rendered. Anything inconclusive (errors, 403/405, ...) keeps the page.
+        """
+        import httpx
+        first_path = urlparse(self.cfg.start_url).path.rstrip("/")
+
+        async def gone(client, url) -> bool:
+            try:
+                resp = await client.head(url, timeout=5)
+            except httpx.HTTPError:
+                return False
+            if resp.status_code in (404, 410): return True
+            final = urlparse(str(resp.url))
+            return bool(resp.history) and final.path.rstrip("/") == first_path and "page=" not in final.query
+
+        # Probe with the shared client if there is one; otherwise a throwaway,
+        # cookie-less client that never touches COOKIE_FILE (no save on close)
+        if self.client is not None:
+            missing = await asyncio.gather(*(gone(self.client, u) for u in urls))
+        else:
+            async with httpx.AsyncClient(headers={"User-Agent": random_ua()}, follow_redirects=True) as client:
+                missing = await asyncio.gather(*(gone(client, u) for u in urls))
+        for i, is_gone in enumerate(missing):
+            if is_gone:
+                log.info(f"[{self.cfg.source_site}] {urls[i]} does not exist — stopping before it")
+                return urls[:i]
+        return urls
+
+    async def _parse_page(self, page, url: str, page_num: int, base_url: str) -> Optional[list[Listing]]:
+        """Cards on a loaded page as listings; None if no card selector matched."""
+        cfg = self.cfg
         card_sels = cfg.card_selectors or GENERIC_CARD
 
-        from urllib.parse import urlparse
-        parsed   = urlparse(cfg.start_url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-
-        await page.route("**/*.{png,jpg,jpeg,gif,webp,woff,woff2,ttf}", lambda r: r.abort())
+        # Grace period for JS
+        await asyncio.sleep(cfg.extra_wait_ms / 1000)
 
-        for page_num in range(1, cfg.max_pages + 1):
-            if page_num == 1:
-                url = cfg.start_url
-            else:
-                slash = "" if cfg.start_url.endswith("/") else "/"
-                url   = f"{cfg.start_url}{slash}page/{page_num}/"
+        if cfg.needs_scroll:
+            await scroll_page(page, scrolls=random.randint(2, 4))
 
-            log.info(f"[{cfg.source_site}] Page {page_num} → {url}")
-
-            success = await self._goto(url, wait_until="load")
-            if not success and page_num > 1:
-                alt_url = f"{cfg.start_url}?page={page_num}"
-                log.info(f"[{cfg.source_site}] Retrying with alt pagination: {alt_url}")
-                success = await self._goto(alt_url, wait_until="load")
+        if self.stealth_level == "high":
+            await move_mouse(page)
 
-            if not success: break
+        # Detect working selector: probe first (cards are usually rendered by now),
+        # and only if nothing matches wait once for the whole cascade and re-probe
+        cards = []
+        try:
+            sel, cards = await extract_cards(page, card_sels, _FIELDS, GENERIC_LINK, own_href=True, with_text=True)
+            if not cards:
+                # Increase timeout for production robustness; one selector group to
+                # wait on, resolving as soon as any cascade entry matches
+                await page.wait_for_selector(any_of(card_sels), timeout=15_000)
+                sel, cards = await extract_cards(page, card_sels, _FIELDS, GENERIC_LINK, own_href=True, with_text=True)
+            if cards:
+                log.info(f"[{cfg.source_site}] '{sel}' → {len(cards)} cards")
+        except Exception: pass
 
-            # Grace period for JS
-            await asyncio.sleep(cfg.extra_wait_ms / 1000)
+        if not cards:
+            log.warning(f"[{cfg.source_site}] No property cards found on page {page_num}")
+            # Save screenshot of failure
+            try:
+                await page.screenshot(path=f"output/fail_{cfg.source_site.replace(' ', '_')}_p{page_num}.png")
+            except: pass
+            return None
 
-            if cfg.needs_scroll:
-                await scroll_page(page, scrolls=random.randint(2, 4))
+        # Repeats within the page are dropped here; across pages scrape() dedups
+        # again, since pages finish in any order
+        return self._build_new(cards)
 
-            await move_mouse(page)
+    async def _has_next(self, page) -> bool:
+        return await has_visible(page, GENERIC_NEXT)
 
-            # Detect working selector
-            cards = []
-            for sel in card_sels:
-                try:
-                    # Increase timeout for production robustness
-                    await page.wait_for_selector(sel, timeout=15_000)
-                    candidates = await page.query_selector_all(sel)
-                    if candidates:
-                        log.info(f"[{cfg.source_site}] '{sel}' → {len(candidates)} cards")
-                        cards = candidates
-                        break
-                except Exception: pass
+    async def scrape(self, context, on_progress=None) -> list[Listing]:
+        page = self._page
+        cfg  = self.cfg
+        results: list[Listing] = []
+        seen_ids: set[str] = set()
 
-            if not cards:
-                log.warning(f"[{cfg.source_site}] No property cards found on page {page_num}")
-                # Save screenshot of failure
-                try:
-                    await page.screenshot(path=f"output/fail_{cfg.source_site.replace(' ', '_')}_p{page_num}.png")
-                except: pass
-                break
-
-            new_count = 0
-            for card in cards:
-                try:
-                    listing = await _parse_card(card, cfg, base_url)
-                    if listing and listing.listing_id not in seen_ids:
-                        seen_ids.add(listing.listing_id)
-                        results.append(listing)
-                        new_count += 1
-                except Exception as e:
-                    log.debug(f"[{cfg.source_site}] Parse error: {e}")
-
-            log.info(f"[{cfg.source_site}] Running total: {len(results)}")
-            if on_progress: on_progress(new_count, page_num)
-
-            has_next = False
-            for sel in GENERIC_NEXT:
-                try:
-                    loc = page.locator(sel).first
-                    if await loc.is_visible(timeout=1_500):
-                        has_next = True
-                        break
-                except Exception: pass
-
-            if not has_next: break
-            await sleep_human(1.5, 3.5)
+        base_url = self.base_url
+
+        await block_heavy_resources(context)
+
+        # Page 1 serially: it decides whether there is anything to paginate
+        log.info(f"[{cfg.source_site}] Page 1 → {cfg.start_url}")
+        if not await self._goto(cfg.start_url, wait_until="load"): return results
+        first = await self._parse_page(page, cfg.start_url, 1, base_url)
+        if first is None: return results
+        self._collect(first, results, seen_ids, 1, on_progress)
+        if cfg.max_pages < 2 or not await self._has_next(page): return results
+
+        # Remaining pages in small concurrent batches (a few tabs per site), consumed in
+        # order. Each page reports its own next link, so pagination ends at the first page
+        # that has no cards or no next link, and the batch after it is never rendered.
+        # _fetch_many gives None for a failed navigation, which gets the ?page=N retry.
+        urls  = await self._probe_pages([self._page_tpl.format(n) for n in range(2, cfg.max_pages + 1)])
+        if not urls: return results
+        nums  = {u: n for n, u in enumerate(urls, start=2)}
+
+        async def parse(p, u):
+            batch = await self._parse_page(p, u, nums[u], base_url)
+            return False if batch is None else (batch, await self._has_next(p))
+
+        for i in range(0, len(urls), PAGE_BATCH):
+            if i: await sleep_human(1.5, 3.5)   # politeness between batches
+            chunk = urls[i:i + PAGE_BATCH]
+            log.info(f"[{cfg.source_site}] Fetching pages {nums[chunk[0]]}-{nums[chunk[-1]]}")
+            done = await self._fetch_many(context, chunk, parse, max_parallel=PAGE_BATCH, wait_until="load")
+            for url, res in zip(chunk, done):
+                page_num = nums[url]
+                if res is None:
+                    alt_url = f"{cfg.start_url}?page={page_num}"
+                    log.info(f"[{cfg.source_site}] Retrying with alt pagination: {alt_url}")
+                    nums[alt_url] = page_num
+                    res = (await self._fetch_many(context, [alt_url], parse, wait_until="load"))[0]
+                if not res: return results
+                batch, has_next = res
+                self._collect(batch, results, seen_ids, page_num, on_progress)
+                if not has_next: return results
 
         return results
 
@@ -281,12 +336,23 @@ async def scrape_all_agencies(configs: list[SiteConfig] = None, headless: bool =
     if configs is None: configs = AGENCY_CONFIGS
     semaphore = asyncio.Semaphore(concurrency)
     all_results: list[Listing] = []
-    async def _run_one(cfg: SiteConfig) -> list[Listing]:
+    # One Chromium and one keep-alive HTTP pool for every site; the semaphore
+    # bounds open contexts, not processes
+    async def _run_one(cfg: SiteConfig, browser, client) -> list[Listing]:
         async with semaphore:
-            scraper = GeneralAgencyScraper(cfg, headless=headless)
-            return await scraper.run()
-    tasks = [_run_one(cfg) for cfg in configs]
-    batches = await asyncio.gather(*tasks, return_exceptions=True)
+            scraper = GeneralAgencyScraper(cfg, headless=headless, client=client)
+            return await scraper.run(browser=browser)
+    from playwright.async_api import async_playwright
+    client = new_http_client() if HAS_SELECTOLAX and any(c.render == "http" for c in configs) else None
+    async with async_playwright() as pw:
+        browser = await launch_browser(pw, headless)
+        try:
+            batches = await asyncio.gather(*[_run_one(cfg, browser, client) for cfg in configs], return_exceptions=True)
+        finally:
+            await browser.close()
+            if client is not None:
+                save_http_cookies(client)
+                await client.aclose()
     for cfg, batch in zip(configs, batches):
         if isinstance(batch, Exception): log.error(f"[{cfg.source_site}] Failed: {batch}")
         else: all_results.extend(batch)
@@ -6,17 +6,19 @@ HausplesScraper  —  Adaptive scraper for Hausples-powered portals.
 
 from __future__ import annotations
 
-import asyncio
-import random
 import logging
 from typing import Optional
 
 from png_scraper.engine import (
     PNGScraper,
+    any_of,
+    block_heavy_resources,
+    extract_cards,
+    has_visible,
     Listing,
     make_listing,
-    sleep_human,
-    scroll_page,
+    make_listing_id,
+    scroll_until_stable,
     move_mouse,
 )
 
@@ -25,69 +27,53 @@ log = logging.getLogger("png_scraper.hausples")
 DEFAULT_BASE_URL = "https://www.hausples.com.pg"
 DEFAULT_SOURCE   = "Hausples"
 
-CARD_SELECTORS = [
+CARD_SELECTORS = (
     "article",
     "article.property-card",
     "div[data-testid='property-card']",
     ".property-card",
     "[class*='PropertyCard']",
     "li[class*='listing']",
-]
+)
 
-TITLE_SELECTORS = [
+TITLE_SELECTORS = (
     ".copy-wrapper .heading",
     "h2.property-card__title",
     ".listing-title",
     "h2",
     "h3",
-]
+)
 
-PRICE_SELECTORS = [
+PRICE_SELECTORS = (
     ".price .value",
     ".price",
     ".property-card__price",
     "span[class*='Price']",
-]
+)
 
-LOCATION_SELECTORS = [
+LOCATION_SELECTORS = (
     ".address",
     ".property-card__location",
     ".location",
-]
+)
 
-LINK_SELECTORS = [
+LINK_SELECTORS = (
     "a.carousel-wrap",
     "a.property-card__link",
     "a[href*='/property/']",
     "a",
-]
+)
 
-NEXT_PAGE_SELECTORS = [
+NEXT_PAGE_SELECTORS = (
     "a[rel='next']",
     "a.next",
     "button[aria-label='Next']",
     ".pagination-next",
-]
+)
 
-async def _first_text(element, selectors: list[str]) -> str:
-    for sel in selectors:
-        try:
-            el = await element.query_selector(sel)
-            if el:
-                txt = (await el.inner_text()).strip()
-                if txt: return txt
-        except Exception: pass
-    return ""
+_FIELDS = {"title": TITLE_SELECTORS, "price": PRICE_SELECTORS, "location": LOCATION_SELECTORS}
 
-async def _first_attr(element, selectors: list[str], attr: str) -> str:
-    for sel in selectors:
-        try:
-            el = await element.query_selector(sel)
-            if el:
-                val = (await el.get_attribute(attr) or "").strip()
-                if val: return val
-        except Exception: pass
-    return ""
+_CARD_ANY = any_of(CARD_SELECTORS)
 
 class HausplesScraper(PNGScraper):
     IS_VERIFIED = True
@@ -98,16 +84,27 @@ class HausplesScraper(PNGScraper):
         self.SOURCE_SITE = source_site
         self.max_pages = max_pages
         self.mode = mode
+        # Card selector cascade, with the one that matched last moved to the front
+        self._card_sels = CARD_SELECTORS
+
+    def _card_url(self, href: str) -> str:
+        return href if href.startswith("http") else f"{self.base_url}{href}"
 
-    async def _parse_card(self, card) -> Optional[Listing]:
-        title    = await _first_text(card, TITLE_SELECTORS)
-        price_r  = await _first_text(card, PRICE_SELECTORS)
-        location = await _first_text(card, LOCATION_SELECTORS)
-        href     = await _first_attr(card, LINK_SELECTORS, "href")
+    def _card_id(self, raw: dict) -> Optional[str]:
+        # New-development promos are not listings
+        if not raw["href"]: return None
+        url = self._card_url(raw["href"])
+        return None if "/new-developments/" in url else make_listing_id(url, raw["price"])
+
+    def _build_listing(self, raw: dict) -> Optional[Listing]:
+        return self._parse_card(raw)
+
+    def _parse_card(self, raw: dict) -> Optional[Listing]:
+        title, price_r, location, href = raw["title"], raw["price"], raw["location"], raw["href"]
 
         if not href: return None
-        url = href if href.startswith("http") else f"{self.base_url}{href}"
-        raw_text = await card.inner_text()
+        url = self._card_url(href)
+        raw_text = raw["text"]
 
         if not title:
             slug = href.strip("/").split("/")[-1]
@@ -126,65 +123,64 @@ class HausplesScraper(PNGScraper):
             raw_text    = raw_text,
         )
 
+    async def _parse_page(self, page, url: str, skip: set[str] = frozenset()) -> list[Listing]:
+        """Listings on a loaded page, minus ids in skip (already collected)."""
+        # Load lazy content: scroll until the page stops growing
+        await scroll_until_stable(page)
+        await move_mouse(page)
+
+        # Probe first; only if nothing matches, wait once for the whole cascade and
+        # re-probe (instead of up to 15s per missing selector)
+        cards = []
+        try:
+            sel, cards = await extract_cards(page, self._card_sels, _FIELDS, LINK_SELECTORS, with_text=True)
+            if not cards:
+                await page.wait_for_selector(_CARD_ANY, timeout=15_000)
+                await scroll_until_stable(page)
+                sel, cards = await extract_cards(page, self._card_sels, _FIELDS, LINK_SELECTORS, with_text=True)
+            if cards:
+                log.info(f"[{self.SOURCE_SITE}] Selector '{sel}' matched {len(cards)} cards")
+                self._card_sels = (sel,) + tuple(s for s in CARD_SELECTORS if s != sel)
+        except Exception: pass
+
+        if not cards:
+            log.warning(f"[{self.SOURCE_SITE}] No cards found on {url}")
+            return []
+
+        return self._build_new(cards, skip)
+
+    async def _has_next(self, page) -> bool:
+        return await has_visible(page, NEXT_PAGE_SELECTORS)
+
     async def scrape(self, context, on_progress=None) -> list[Listing]:
         page = self._page
         results: list[Listing] = []
         seen_ids: set[str] = set()
         base_search_url = f"{self.base_url}/{self.mode}/"
 
-        await page.route("**/*.{png,jpg,jpeg,gif,webp,svg,woff,woff2,ttf}", lambda r: r.abort())
-
-        for page_num in range(1, self.max_pages + 1):
-            url = base_search_url if page_num == 1 else f"{base_search_url}?page={page_num}"
-            log.info(f"[{self.SOURCE_SITE}] {self.mode.upper()} Page {page_num}/{self.max_pages} → {url}")
-
-            if not await self._goto(url, wait_until="load"):
+        await block_heavy_resources(context)
+
+        # Page 1 serially: it tells us whether there is anything to paginate
+        log.info(f"[{self.SOURCE_SITE}] {self.mode.upper()} Page 1/{self.max_pages} → {base_search_url}")
+        if not await self._goto(base_search_url, wait_until="load"): return results
+        first = await self._parse_page(page, base_search_url)
+        if not first: return results
+        self._collect(first, results, seen_ids, 1, on_progress)
+        if self.max_pages < 2 or not await self._has_next(page): return results
+
+        # ?page=2 ... fetched concurrently; stop at the first page that failed or
+        # came back empty, as the serial walk did
+        urls = [f"{base_search_url}?page={n}" for n in range(2, self.max_pages + 1)]
+        log.info(f"[{self.SOURCE_SITE}] {self.mode.upper()} Fetching pages 2-{self.max_pages} concurrently")
+        # Cards already collected on page 1 are dropped before make_listing
+        async def parse(p, u):
+            return await self._parse_page(p, u, skip=seen_ids)
+        batches = await self._fetch_many(context, urls, parse, wait_until="load")
+        for page_num, batch in enumerate(batches, start=2):
+            if not batch: break
+            # A clamped ?page=N (site re-serves its last page) adds nothing new
+            if not self._collect(batch, results, seen_ids, page_num, on_progress):
+                log.info(f"[{self.SOURCE_SITE}] Page {page_num} had no new listings — stopping")
                 break
 
-            # Wait for lazy content
-            await asyncio.sleep(3)
-            await scroll_page(page, scrolls=random.randint(3, 5))
-            await move_mouse(page)
-
-            cards = []
-            for sel in CARD_SELECTORS:
-                try:
-                    await page.wait_for_selector(sel, timeout=15_000)
-                    cards = await page.query_selector_all(sel)
-                    if cards:
-                        log.info(f"[{self.SOURCE_SITE}] Selector '{sel}' matched {len(cards)} cards")
-                        break
-                except Exception: pass
-
-            if not cards:
-                log.warning(f"[{self.SOURCE_SITE}] No cards found on page {page_num}")
-                break
-
-            new_count = 0
-            for card in cards:
-                try:
-                    listing = await self._parse_card(card)
-                    if listing and listing.listing_id not in seen_ids:
-                        if "/new-developments/" in listing.listing_url: continue
-                        seen_ids.add(listing.listing_id)
-                        results.append(listing)
-                        new_count += 1
-                except Exception as e:
-                    log.debug(f"[{self.SOURCE_SITE}] Card parse error: {e}")
-
-            log.info(f"[{self.SOURCE_SITE}] Running total: {len(results)} listings")
-            if on_progress: on_progress(new_count, page_num)
-
-            has_next = False
-            for sel in NEXT_PAGE_SELECTORS:
-                try:
-                    btn = page.locator(sel).first
-                    if await btn.is_visible(timeout=2_000):
-                        has_next = True
-                        break
-                except Exception: pass
-
-            if not has_next: break
-            await sleep_human(1.5, 3.5)
-
         return results
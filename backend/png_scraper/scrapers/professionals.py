@@ -5,7 +5,8 @@ ProfessionalsScraper  —  https://theprofessionals.com.pg/rent/
 
 The Professionals PNG uses a WordPress/Elementor-based real estate theme
 (typically RealHomes or similar). Cards are rendered server-side, so no
-JS-wait headaches — but we still use Playwright for stealth.
+JS-wait headaches: pages are fetched over plain HTTP and parsed with selectolax,
+with Playwright kept as the fallback (challenge pages, missing selectolax).
 
 Selector strategy:
     Cards  : article.property-item | .property_item | [class*="property"]
@@ -18,17 +19,21 @@ Selector strategy:
 
 from __future__ import annotations
 
-import asyncio
-import random
 import logging
 from typing import Optional
 
 from png_scraper.engine import (
     PNGScraper,
+    any_of,
+    block_heavy_resources,
+    extract_cards,
+    has_visible,
+    html_cards,
+    html_has_next,
     Listing,
     make_listing,
-    sleep_human,
-    scroll_page,
+    make_listing_id,
+    scroll_until_stable,
     move_mouse,
 )
 
@@ -40,7 +45,7 @@ SOURCE_SITE = "The Professionals"
 
 # ── selectors (ordered by specificity – most reliable first) ─────────────────
 
-CARD_SELECTORS = [
+CARD_SELECTORS = (
     "article.property-item",
     ".property_item",
     "article[class*='property']",
@@ -49,9 +54,9 @@ CARD_SELECTORS = [
     ".listings-container article",
     "ul.properties-list li",
     "div.item-body",                   # RealHomes theme
-]
+)
 
-TITLE_SELECTORS = [
+TITLE_SELECTORS = (
     ".item-title h2 a",
     ".item-title h3 a",
     ".listing_title a",
@@ -60,9 +65,9 @@ TITLE_SELECTORS = [
     ".rh_prop_card__title a",         # RealHomes
     "h2 a",
     "h3 a",
-]
+)
 
-PRICE_SELECTORS = [
+PRICE_SELECTORS = (
     ".item-price span",
     ".item-price",
     ".price",
@@ -70,9 +75,9 @@ PRICE_SELECTORS = [
     ".rh_prop_card__price",
     "[data-price]",
     "span[class*='amount']",
-]
+)
 
-LOCATION_SELECTORS = [
+LOCATION_SELECTORS = (
     ".item-address",
     ".location",
     "[class*='address']",
@@ -81,18 +86,18 @@ LOCATION_SELECTORS = [
     "[itemprop='address']",
     ".suburb",
     "span[class*='city']",
-]
+)
 
-BEDS_SELECTORS = [
+BEDS_SELECTORS = (
     ".rh_meta__bedrooms",
     ".bedrooms",
     "[class*='bed']",
     ".meta-bedrooms",
     "[title*='Bedroom']",
     "li[class*='bed']",
-]
+)
 
-LINK_SELECTORS = [
+LINK_SELECTORS = (
     ".item-title a",
     "h2 a[href*='/property/']",
     "h3 a[href*='/property/']",
@@ -100,9 +105,9 @@ LINK_SELECTORS = [
     "a[href*='/listing']",
     "a[href*='/rent/']",
     "article > a",
-]
+)
 
-NEXT_SELECTORS = [
+NEXT_SELECTORS = (
     "a.next",
     "a[rel='next']",
     ".pagination .next",
@@ -110,60 +115,39 @@ NEXT_SELECTORS = [
     "[class*='nav-next'] a",
     "a:has-text('Next')",
     "a:has-text('›')",
-]
+)
 
 
-async def _first_text(el, selectors: list[str]) -> str:
-    for sel in selectors:
-        try:
-            child = await el.query_selector(sel)
-            if child:
-                txt = (await child.inner_text()).strip()
-                if txt:
-                    return txt
-        except Exception:
-            pass
-    return ""
+# Field cascades, shared by the browser (extract_cards) and static (html_cards) paths
+_FIELDS = {"title": TITLE_SELECTORS, "price": PRICE_SELECTORS,
+           "location": LOCATION_SELECTORS, "beds": BEDS_SELECTORS}
 
 
-async def _first_attr(el, selectors: list[str], attr: str) -> str:
-    for sel in selectors:
-        try:
-            child = await el.query_selector(sel)
-            if child:
-                val = (await child.get_attribute(attr) or "").strip()
-                if val:
-                    return val
-        except Exception:
-            pass
-    return ""
+_CARD_ANY = any_of(CARD_SELECTORS)
 
 
-async def _parse_card(card, page_base: str = BASE_URL) -> Optional[Listing]:
-    title    = await _first_text(card, TITLE_SELECTORS)
-    price_r  = await _first_text(card, PRICE_SELECTORS)
-    location = await _first_text(card, LOCATION_SELECTORS)
-    href     = await _first_attr(card, LINK_SELECTORS, "href")
+def _card_url(href: str, page_base: str = BASE_URL) -> str:
+    return href if href.startswith("http") else f"{page_base}{href}"
+
+
+def _card_id(raw: dict) -> Optional[str]:
+    # The listing_id make_listing would assign, without running the normalizer
+    return make_listing_id(_card_url(raw["href"]), raw["price"]) if raw["href"] else None
 
-    if not href:
-        # Last resort: grab any <a> in the card
-        try:
-            a = await card.query_selector("a[href]")
-            if a:
-                href = (await a.get_attribute("href") or "").strip()
-        except Exception:
-            pass
+
+def _parse_card(raw: dict, page_base: str = BASE_URL) -> Optional[Listing]:
+    title, price_r, location, href = raw["title"], raw["price"], raw["location"], raw["href"]
 
     if not href:
         return None
 
-    url = href if href.startswith("http") else f"{page_base}{href}"
+    url = _card_url(href, page_base)
 
     # Beds from dedicated element
-    beds_text = await _first_text(card, BEDS_SELECTORS)
+    beds_text = raw["beds"]
 
     # Full card raw text for suburb/bedroom fallback
-    raw = f"{title} {price_r} {location} {beds_text}"
+    raw_text = f"{title} {price_r} {location} {beds_text}"
 
     if not title:
         title = f"Property — {location}" if location else "The Professionals Listing"
@@ -175,10 +159,14 @@ async def _parse_card(card, page_base: str = BASE_URL) -> Optional[Listing]:
         location    = location,
         listing_url = url,
         is_verified = True,
-        raw_text    = raw,
+        raw_text    = raw_text,
     )
 
 
+# Static path: link texts standing in for the :has-text() next selectors
+_NEXT_LINK_TEXTS = ("next", "›")
+
+
 class ProfessionalsScraper(PNGScraper):
     """
     Dedicated scraper for https://theprofessionals.com.pg/rent/
@@ -187,84 +175,100 @@ class ProfessionalsScraper(PNGScraper):
     • WordPress/RealHomes theme selector strategy
     • Handles both grid and list layout variants
     • Pagination via wp-pagenavi or standard WordPress pagination
-    • Property image blocking for bandwidth efficiency
+    • Plain HTTP + selectolax first (PNGScraper._scrape_http); Playwright (images blocked) as fallback
     """
 
     SOURCE_SITE = SOURCE_SITE
     IS_VERIFIED = True
 
-    def __init__(self, max_pages: int = 5, headless: bool = True):
-        super().__init__(headless)
+    def __init__(self, max_pages: int = 5, headless: bool = True, client=None):
+        super().__init__(headless, client=client)
         self.max_pages = max_pages
+        # Card selector cascade, with the one that matched last moved to the front
+        self._card_sels = CARD_SELECTORS
 
-    async def scrape(self, context, on_progress=None) -> list[Listing]:
-        page = self._page
-        results: list[Listing] = []
-        seen_ids: set[str] = set()
+    # ── static path hooks (see PNGScraper._scrape_http) ──
+    def _static_urls(self) -> list[str]:
+        # Same /page/N/ scheme as the browser path
+        return [RENT_URL] + [f"{RENT_URL}page/{n}/" for n in range(2, self.max_pages + 1)]
 
-        await page.route("**/*.{png,jpg,jpeg,gif,webp,woff,woff2,ttf}", lambda r: r.abort())
+    def _static_cards(self, tree) -> list[dict]:
+        return html_cards(tree, CARD_SELECTORS, _FIELDS, LINK_SELECTORS)[1]
 
-        for page_num in range(1, self.max_pages + 1):
-            # WordPress pagination: /rent/page/2/ or ?paged=2
-            if page_num == 1:
-                url = RENT_URL
-            else:
-                url = f"{RENT_URL}page/{page_num}/"
+    def _static_has_next(self, tree) -> bool:
+        return html_has_next(tree, NEXT_SELECTORS, _NEXT_LINK_TEXTS)
 
-            log.info(f"[Professionals] Page {page_num}/{self.max_pages} → {url}")
+    def _card_id(self, raw: dict) -> Optional[str]:
+        return _card_id(raw)
 
-            if not await self._goto(url):
-                break
+    def _build_listing(self, raw: dict) -> Optional[Listing]:
+        return _parse_card(raw)
 
-            await scroll_page(page, scrolls=random.randint(2, 4))
-            await move_mouse(page)
-
-            # Detect working card selector
-            cards = []
-            for sel in CARD_SELECTORS:
-                try:
-                    await page.wait_for_selector(sel, timeout=7_000)
-                    cards = await page.query_selector_all(sel)
-                    if cards:
-                        log.info(f"[Professionals] '{sel}' → {len(cards)} cards")
-                        break
-                except Exception:
-                    pass
+    async def _parse_page(self, page, url: str, skip: set[str] = frozenset()) -> list[Listing]:
+        """Listings on a loaded page, minus ids in skip (already collected)."""
+        await scroll_until_stable(page)
+        await move_mouse(page)
 
+        # Detect working card selector: probe first, and only if nothing matches wait
+        # once for the whole cascade and re-probe (instead of up to 7s per selector)
+        cards = []
+        try:
+            sel, cards = await extract_cards(page, self._card_sels, _FIELDS, LINK_SELECTORS)
             if not cards:
-                log.warning(f"[Professionals] No cards on page {page_num}")
-                break
+                await page.wait_for_selector(_CARD_ANY, timeout=7_000)
+                await scroll_until_stable(page)
+                sel, cards = await extract_cards(page, self._card_sels, _FIELDS, LINK_SELECTORS)
+            if cards:
+                log.info(f"[Professionals] '{sel}' → {len(cards)} cards")
+                self._card_sels = (sel,) + tuple(s for s in CARD_SELECTORS if s != sel)
+        except Exception:
+            pass
 
-            new_count = 0
-            for card in cards:
-                try:
-                    listing = await _parse_card(card)
-                    if listing and listing.listing_id not in seen_ids:
-                        seen_ids.add(listing.listing_id)
-                        results.append(listing)
-                        new_count += 1
-                except Exception as e:
-                    log.debug(f"[Professionals] Parse error: {e}")
-
-            log.info(f"[Professionals] Running total: {len(results)}")
-            if on_progress:
-                on_progress(new_count, page_num)
-
-            # WordPress next-page detection
-            has_next = False
-            for sel in NEXT_SELECTORS:
-                try:
-                    loc = page.locator(sel).first
-                    if await loc.is_visible(timeout=2_000):
-                        has_next = True
-                        break
-                except Exception:
-                    pass
-
-            if not has_next:
-                log.info("[Professionals] No next page — done")
-                break
+        if not cards:
+            log.warning(f"[Professionals] No cards on {url}")
+            return []
+
+        return self._build_new(cards, skip)
+
+    async def _has_next(self, page) -> bool:
+        # WordPress next-page detection
+        return await has_visible(page, NEXT_SELECTORS)
+
+    async def scrape(self, context, on_progress=None) -> list[Listing]:
+        page = self._page
+        results: list[Listing] = []
+        seen_ids: set[str] = set()
 
-            await sleep_human(2.5, 5.0)
+        await block_heavy_resources(context)
+
+        # Page 1 serially: it tells us whether there is anything to paginate
+        log.info(f"[Professionals] Page 1/{self.max_pages} → {RENT_URL}")
+        if not await self._goto(RENT_URL):
+            return results
+        first = await self._parse_page(page, RENT_URL)
+        if not first:
+            return results
+        self._collect(first, results, seen_ids, 1, on_progress)
+
+        if self.max_pages < 2 or not await self._has_next(page):
+            log.info("[Professionals] No next page — done")
+            return results
+
+        # WordPress pagination: /rent/page/2/ ... fetched concurrently; stop at the
+        # first page that failed or came back empty, as the serial walk did
+        urls = [f"{RENT_URL}page/{n}/" for n in range(2, self.max_pages + 1)]
+        log.info(f"[Professionals] Fetching pages 2-{self.max_pages} concurrently")
+        # Cards already collected on page 1 are dropped before make_listing
+        async def parse(p, u):
+            return await self._parse_page(p, u, skip=seen_ids)
+
+        batches = await self._fetch_many(context, urls, parse)
+        for page_num, batch in enumerate(batches, start=2):
+            if not batch:
+                break
+            # A clamped /page/N/ (site re-serves its last page) adds nothing new
+            if not self._collect(batch, results, seen_ids, page_num, on_progress):
+                log.info(f"[Professionals] Page {page_num} had no new listings — stopping")
+                break
 
         return results
@@ -1,5 +1,6 @@
 from png_scraper.engine import Listing
 from png_scraper.deduplicator import group_listings
+from png_scraper.main import deduplicate
 
 def test_dedup():
     l1 = Listing(listing_id="1", source_site="Hausples", title="3BR House", price_raw="K2500",
@@ -28,5 +29,16 @@ def test_dedup():
     assert l1.group_id == l2.group_id or "Prices 2400/2500 didn't group"
     assert l1.group_id != l3.group_id
 
+def test_deduplicate_keeps_verified_copy():
+    def mk(lid, site, verified, price=2500):
+        return Listing(listing_id=lid, source_site=site, title="3BR House", price_raw=f"K{price}",
+                       price_monthly_k=price, price_confidence="high", location="Boroko", suburb="Boroko",
+                       listing_url=lid, is_verified=verified, property_type="House", bedrooms=3)
+
+    fb, agency = mk("fb", "Facebook", False), mk("ag", "Hausples", True)
+    other = mk("x", "Facebook", False, price=4000)
+    out = deduplicate([fb, other, agency, mk("fb", "Facebook", False)])
+    assert [l.listing_id for l in out] == ["ag", "x"]
+
 if __name__ == "__main__":
     test_dedup()
@@ -0,0 +1,182 @@
+import sys
+import os
+import json
+import asyncio
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+import main
+
+SAMPLE = [{
+    "listing_id": "abc123", "source_site": "Hausples", "title": "3 Bedroom House – Boroko",
+    "price_raw": "K3,000/month", "price_monthly_k": 3000, "location": "Boroko, NCD",
+    "suburb": "Boroko", "listing_url": "https://hausples.com.pg/listing/1", "is_verified": True,
+    "property_type": "House", "bedrooms": 3, "scraped_at": "2026-04-01T00:00:00+00:00",
+}]
+
+def test_load_listings_cached_until_file_changes(tmp_path, monkeypatch):
+    out = tmp_path / "listings.json"
+    out.write_text(json.dumps(SAMPLE))
+    monkeypatch.setattr(main, "OUTPUT_FILE", out)
+    monkeypatch.setattr(main, "_get_db", lambda: None)
+    monkeypatch.setitem(main._listings_cache, "mtime", None)
+
+    first = main._load_listings()
+    assert len(first) == 1
+    # Unchanged file: the very same parsed list is served from memory
+    assert main._load_listings() is first
+
+    out.write_text(json.dumps(SAMPLE * 2))
+    os.utime(out, ns=(0, out.stat().st_mtime_ns + 1_000_000))
+    assert main._load_listings() is not first
+
+def test_load_listings_missing_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "OUTPUT_FILE", tmp_path / "missing.json")
+    monkeypatch.setattr(main, "_get_db", lambda: None)
+    monkeypatch.setitem(main._listings_cache, "mtime", None)
+    assert main._load_listings() == []
+
+def test_load_listings_does_not_cache_failed_reads(tmp_path, monkeypatch):
+    out = tmp_path / "listings.json"
+    out.write_text(json.dumps(SAMPLE)[:20])   # caught mid-write
+    monkeypatch.setattr(main, "OUTPUT_FILE", out)
+    monkeypatch.setattr(main, "_get_db", lambda: None)
+    monkeypatch.setitem(main._listings_cache, "mtime", None)
+    mtime = out.stat().st_mtime_ns
+    assert main._load_listings() == []
+
+    # Same mtime, now complete: the failed read was not pinned to it
+    out.write_text(json.dumps(SAMPLE))
+    os.utime(out, ns=(mtime, mtime))
+    assert len(main._load_listings()) == 1
+
+def test_export_json_replaces_file(tmp_path):
+    from png_scraper.main import export_json
+    out = tmp_path / "listings.json"
+    out.write_text("stale")
+    export_json([], out)
+    assert json.loads(out.read_text()) == []
+    assert [p.name for p in tmp_path.iterdir()] == ["listings.json"]
+
+def test_analytics_snapshot_single_build():
+    ls = main._mock_listings()
+    snap = main._analytics_snapshot(ls)
+    assert main._analytics_snapshot(ls) is snap
+
+    overview = snap["overview"]
+    assert overview["total_listings"] == len(ls)
+    assert overview["verified_listings"] == sum(1 for l in ls if l["is_verified"])
+    assert sum(s["count"] for s in snap["sources"]) == len(ls)
+    assert sum(s["supply"] for s in snap["supply_demand"]) == len(ls)
+    assert {s["suburb"] for s in snap["heatmap"]} == {l["suburb"] for l in ls}
+
+def test_listing_filters_use_index(tmp_path, monkeypatch):
+    out = tmp_path / "listings.json"
+    out.write_text(json.dumps(main._mock_listings()))
+    monkeypatch.setattr(main, "OUTPUT_FILE", out)
+    monkeypatch.setattr(main, "_get_db", lambda: None)
+    monkeypatch.setitem(main._listings_cache, "mtime", None)
+    ls = main._load_listings()
+
+    res = asyncio.run(main.get_listings(suburb="BOROKO", source="ray", min_price=1000, max_price=5000,
+                                        page=1, limit=100, current_user=None))
+    expected = {l["listing_id"] for l in ls if l["suburb"] == "Boroko" and "ray" in l["source_site"].lower()
+                and 1000 <= l["price_monthly_k"] <= 5000}
+    assert {l["listing_id"] for l in res["listings"]} == expected
+    assert res["total"] == len(expected)
+    assert all(l["market_value"]["benchmark_avg"] == 3150 for l in res["listings"])
+    # Scores go on response copies, not on the shared cached listings
+    assert not any("market_value" in l for l in ls)
+
+def test_simulated_trends_are_deterministic(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "HISTORY_FILE", tmp_path / "no_history.json")
+    ls = main._mock_listings()
+    rows = main._trends(ls)
+    assert rows == main._trends(ls)
+    assert len(rows) == 8
+    assert all(0.93 <= main._trend_noise("Waigani", w) <= 1.07 for w in range(8))
+
+def test_large_listing_pages_stream_valid_json():
+    rows = main._mock_listings()[:120]
+    head = {"total": 120, "page": 1, "pages": 1, "limit": 120}
+
+    async def collect():
+        return b"".join([chunk async for chunk in main._stream_listings_page(head, rows)])
+
+    body = json.loads(asyncio.run(collect()))
+    assert body["total"] == 120
+    assert [l["listing_id"] for l in body["listings"]] == [l["listing_id"] for l in rows]
+
+def test_trends_use_weekly_window_averages(tmp_path, monkeypatch):
+    from datetime import datetime, timezone, timedelta
+    monkeypatch.setattr(main, "HISTORY_FILE", tmp_path / "no_history.json")
+    recent = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    ls = [{"suburb": "Waigani", "price_monthly_k": p, "scraped_at": recent} for p in (4000, 6000)]
+    rows = main._trends(ls)
+    assert rows[-1]["Waigani"] == 5000
+    # Older weeks have no listings and fall back to the noisy overall average
+    assert 0.93 * 5000 <= rows[0]["Waigani"] <= 1.07 * 5000
+
+def test_analytics_etag_not_modified():
+    from fastapi.testclient import TestClient
+    from unittest.mock import MagicMock
+    main.app.dependency_overrides[main.get_current_user] = lambda: MagicMock(role="admin")
+    try:
+        client = TestClient(main.app)
+        first = client.get("/api/analytics/sources")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        again = client.get("/api/analytics/sources", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+    finally:
+        main.app.dependency_overrides.clear()
+
+def test_mock_listings_are_fresh_per_call():
+    first = main._mock_listings()
+    first[0]["suburb"] = "Mutated"
+    first.clear()
+    again = main._mock_listings()
+    assert len(again) == 240 and again[0]["suburb"] != "Mutated"
+
+def test_listings_route_tolerates_legacy_rows(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from unittest.mock import MagicMock
+    legacy = [{**l, "title": None, "location": None, "health_score": 87.5, "bedrooms": 2.0,
+               "is_middleman": None} for l in main._mock_listings()[:150]]
+    out = tmp_path / "listings.json"
+    out.write_text(json.dumps(legacy))
+    monkeypatch.setattr(main, "OUTPUT_FILE", out)
+    monkeypatch.setattr(main, "_get_db", lambda: None)
+    monkeypatch.setitem(main._listings_cache, "mtime", None)
+    main.app.dependency_overrides[main.get_current_user] = lambda: MagicMock(role="admin")
+    try:
+        client = TestClient(main.app)
+        small = client.get("/api/listings", params={"limit": 25, "sort": "listing_id", "order": "asc"})
+        big = client.get("/api/listings", params={"limit": 150, "sort": "listing_id", "order": "asc"})
+        assert small.status_code == big.status_code == 200
+        # Buffered (response_model) and streamed pages serialize rows identically
+        assert big.json()["listings"][:25] == small.json()["listings"]
+        row = small.json()["listings"][0]
+        assert row["title"] is None and row["health_score"] == 87.5 and row["is_middleman"] is None
+    finally:
+        main.app.dependency_overrides.clear()
+
+def test_derived_async_keeps_results_with_their_listings():
+    import threading
+    a, b = [{"n": 1}], [{"n": 2}, {"n": 3}]
+
+    async def go():
+        started, release = threading.Event(), threading.Event()
+        def slow_build(ls):
+            started.set(); release.wait(5)
+            return len(ls)
+        task = asyncio.create_task(main._derived_async(a, "count", slow_build))
+        await asyncio.to_thread(started.wait, 5)
+        # Another handler moves the cache to new listings while the build runs
+        assert main._derived(b, "count", len) == 2
+        release.set()
+        assert await task == 1
+        # The stale build did not land in the new listings' entries
+        assert main._derived(b, "count", lambda ls: -1) == 2
+
+    asyncio.run(go())
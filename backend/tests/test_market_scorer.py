@@ -0,0 +1,52 @@
+import statistics
+from dataclasses import asdict
+
+import numpy as np
+
+from png_scraper.market_scorer import (
+    FORMAL_LISTINGS_DB, compute_stats, get_suburb_stats, score_listings_batch, score_market_value,
+)
+
+def test_compute_stats_matches_plain_python():
+    prices = [3200, 2800, 3500, 3100]
+    s = compute_stats(prices, "Boroko")
+    assert (s.sample_size, s.min_price, s.max_price) == (4, 2800, 3500)
+    assert s.avg_price == round(statistics.fmean(prices), 2)
+    assert s.median_price == statistics.median(prices)
+    assert s.std_dev == round(statistics.pstdev(prices), 2)
+    assert compute_stats([], "Nowhere").sample_size == 0
+    # Unsorted ndarrays are sorted too, not trusted as-is
+    assert compute_stats(np.array(prices), "Boroko") == s
+
+def test_suburb_stats_use_db_prices():
+    s = get_suburb_stats("Gerehu Stage 3")
+    assert s.suburb == "Gerehu Stage 3"
+    assert s.sample_size == len(FORMAL_LISTINGS_DB["gerehu"])
+    assert get_suburb_stats("Moresby Hills").sample_size == sum(map(len, FORMAL_LISTINGS_DB.values()))
+
+def test_cached_suburb_stats_are_copies():
+    first = get_suburb_stats("Boroko")
+    first.confidence = None
+    again = get_suburb_stats("boroko ")
+    assert again.confidence is not None and again.suburb == "boroko "
+    assert get_suburb_stats("Nowhere").confidence.value == "Low"
+
+def test_batch_matches_single_scoring():
+    listings = [{"price_pgk_monthly": p, "suburb": s, "property_type": t}
+                for p in (900, 3100, 9500) for s in ("Boroko", "Gerehu Stage 3", "Moresby Hills")
+                for t in (None, "Apartment")]
+    listings.append({"price_pgk_monthly": 0, "suburb": "Boroko"})
+    score_listings_batch(listings)
+    for l in listings[:-1]:
+        assert l["market_value"] == asdict(score_market_value(l["price_pgk_monthly"], l["suburb"], l["property_type"]))
+    assert listings[-1]["market_value"]["label"] == "Unknown"
+
+def test_batch_without_text_keeps_labels():
+    listings = [{"price_pgk_monthly": p, "suburb": "Boroko", "property_type": t}
+                for p in (900, 3100, 9500) for t in (None, "Room")]
+    full = score_listings_batch([dict(l) for l in listings])
+    lean = score_listings_batch([dict(l) for l in listings], describe=False)
+    for f, l in zip(full, lean):
+        assert "summary" not in l["market_value"]
+        for k, v in l["market_value"].items():
+            assert f["market_value"][k] == v
@@ -0,0 +1,22 @@
+from png_scraper.normalizer import normalize, parse_location, parse_price, parse_property_type
+
+def test_keyword_scan_keeps_alias_priority():
+    # "boroko" is listed before "east boroko", and House before Townhouse
+    assert parse_location("Unit in East Boroko")[1] == "Boroko"
+    assert parse_property_type("Modern town house") == "House"
+    assert parse_property_type("Office space, Waigani") == "Commercial"
+    r = normalize("2br apartment at Gordons, near Waigani")
+    assert (r["suburb"], r["property_type"]) == ("Waigani", "Apartment")
+
+def test_price_prefers_first_explicit_period():
+    assert parse_price("K2,500 per month") == (2500, "k2500 per month", "high")
+    assert parse_price("Bond 3000, rent 800 per week") == (3466, "800 per week", "high")
+    assert parse_price("K1500 negotiable") == (6500, "k1500", "medium")
+    assert parse_price("no price here") == (None, "", "low")
+
+def test_listing_fields_match_full_normalize():
+    from png_scraper.normalizer import TEST_CASES, normalize_listing_fields
+    for _, text in TEST_CASES:
+        full = normalize(text)
+        lean = normalize_listing_fields(text)
+        assert lean == {k: full[k] for k in lean}
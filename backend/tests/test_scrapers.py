@@ -0,0 +1,321 @@
+import asyncio
+
+from png_scraper.scrapers.facebook import _parse_marketplace_card
+from png_scraper.scrapers.general_agency import AGENCY_CONFIGS, _card_id, _parse_card
+
+def test_agency_card_from_extracted_fields():
+    cfg = AGENCY_CONFIGS[2]
+    raw = {"title": "", "price": "K3,000 per month", "location": "Boroko",
+           "href": "/property/12", "text": "3 bedroom house"}
+    listing = _parse_card(raw, cfg, "https://www.sre.com.pg")
+    assert listing.listing_url == "https://www.sre.com.pg/property/12"
+    assert listing.title == "Property — Boroko"
+    assert (listing.price_monthly_k, listing.suburb, listing.bedrooms) == (3000, "Boroko", 3)
+    assert _parse_card(dict(raw, href=""), cfg, "https://www.sre.com.pg") is None
+    # Pre-build dedup key is the id make_listing assigns
+    assert _card_id(raw, "https://www.sre.com.pg") == listing.listing_id
+
+def test_marketplace_card_from_extracted_texts():
+    raw = _parse_marketplace_card({"texts": ["K800", "2 bedroom flat", "Gerehu, NCD"],
+                                   "href": "/marketplace/item/1/"})
+    assert raw["url"] == "https://www.facebook.com/marketplace/item/1/"
+    assert (raw["price_raw"], raw["location"]) == ("K800", "Gerehu, NCD")
+    assert raw["description"] == "2 bedroom flat | Gerehu, NCD"
+    assert _parse_marketplace_card({"texts": [], "href": ""}) is None
+
+def test_agency_pagination_fetches_pages_concurrently_in_order():
+    from png_scraper.scrapers.general_agency import GeneralAgencyScraper, SiteConfig
+
+    class FakePage:
+        async def close(self): pass
+
+    class FakeContext:
+        async def route(self, *a): pass
+        async def new_page(self): return FakePage()
+
+    cfg = SiteConfig("Test Agency", "https://agency.test/rent", max_pages=5)
+    scraper = GeneralAgencyScraper(cfg)
+    scraper._page = FakePage()
+    visited = []
+
+    async def goto(url, wait_until="load", page=None):
+        visited.append(url)
+        return "/page/3/" not in url          # page 3 only loads via ?page=3
+
+    async def parse_page(page, url, page_num, base_url):
+        if page_num == 4:
+            return None                         # no cards: pagination ends here
+        return [_parse_card({"title": f"House {page_num}", "price": "K2000", "location": "Boroko",
+                             "href": f"/p/{page_num}", "text": ""}, cfg, base_url)]
+
+    async def has_next(page): return True
+    async def probe(urls): return urls
+    scraper._goto, scraper._parse_page, scraper._has_next = goto, parse_page, has_next
+    scraper._probe_pages = probe
+
+    results = asyncio.run(scraper.scrape(FakeContext()))
+    assert [l.title for l in results] == ["House 1", "House 2", "House 3"]
+    assert "https://agency.test/rent?page=3" in visited
+    # Page 4 ended pagination inside the first batch, so page 5 was never rendered
+    assert not any("/page/5/" in u for u in visited)
+
+def test_agency_pagination_stops_at_last_next_link(monkeypatch):
+    from png_scraper.scrapers import general_agency
+    from png_scraper.scrapers.general_agency import GeneralAgencyScraper, SiteConfig
+
+    class FakePage:
+        def __init__(self, url=""): self.url = url
+        async def close(self): pass
+
+    class FakeContext:
+        async def route(self, *a): pass
+        async def new_page(self): return FakePage()
+
+    async def no_sleep(*a): pass
+    monkeypatch.setattr(general_agency, "sleep_human", no_sleep)
+    cfg = SiteConfig("Test Agency", "https://agency.test/rent", max_pages=9)
+    scraper = GeneralAgencyScraper(cfg)
+    scraper._page = FakePage()
+    visited = []
+
+    async def goto(url, wait_until="load", page=None):
+        visited.append(url)
+        if page is not None: page.url = url
+        return True
+
+    async def parse_page(page, url, page_num, base_url):
+        return [_parse_card({"title": f"House {page_num}", "price": "K2000", "location": "Boroko",
+                             "href": f"/p/{page_num}", "text": ""}, cfg, base_url)]
+
+    async def has_next(page): return "/page/5/" not in (page.url or "")
+    async def probe(urls): return urls
+    scraper._goto, scraper._parse_page, scraper._has_next = goto, parse_page, has_next
+    scraper._probe_pages = probe
+
+    results = asyncio.run(scraper.scrape(FakeContext()))
+    assert [l.title for l in results] == [f"House {n}" for n in range(1, 6)]
+    # Batches are 2-4 and 5-7; page 5 had no next link, so 8-9 never load
+    assert not any(f"/page/{n}/" in u for u in visited for n in (8, 9))
+
+def test_static_html_cards_follow_cascades():
+    import pytest
+    lexbor = pytest.importorskip("selectolax.lexbor")
+    from png_scraper.engine import html_cards, html_has_next
+    from png_scraper.scrapers.general_agency import GENERIC_NEXT, _FIELDS
+    html = """<div class="wrap">
+      <a class="recent-listing" href="/rent/1"><div class="recent-listing-title">3BR House</div>
+        <div class="recent-listing-price">K3,500 per month</div><span class="location">Gerehu</span></a>
+      <a class="recent-listing" href="/rent/2"><h4>Flat</h4></a>
+      <nav><a href="/rent/page/2/">Next ›</a></nav></div>"""
+    tree = lexbor.LexborHTMLParser(html)
+    sel, cards = html_cards(tree, ["article.missing", "a.recent-listing"], _FIELDS, [])
+    assert sel == "a.recent-listing"
+    assert cards[0] == {"title": "3BR House", "price": "K3,500 per month", "location": "Gerehu",
+                        "href": "/rent/1", "text": "3BR House K3,500 per month Gerehu"}
+    assert (cards[1]["title"], cards[1]["href"]) == ("Flat", "/rent/2")
+    assert html_has_next(tree, GENERIC_NEXT, ("next",))
+
+def test_agency_cookie_jar_round_trip(tmp_path, monkeypatch):
+    from png_scraper import engine as ga
+    monkeypatch.setattr(ga, "COOKIE_FILE", tmp_path / "cookies.json")
+
+    async def go():
+        client = ga.new_http_client()
+        client.cookies.set("sid", "abc", domain="example.com.pg", path="/")
+        ga.save_http_cookies(client)
+        await client.aclose()
+        warm = ga.new_http_client()
+        try:
+            return warm.cookies.get("sid", domain="example.com.pg")
+        finally:
+            await warm.aclose()
+
+    assert asyncio.run(go()) == "abc"
+
+def test_marketplace_scroll_stops_when_feed_stalls(monkeypatch):
+    from png_scraper.scrapers import facebook as fb
+
+    async def noop(*a, **k): return None
+    for name in ("sleep_human", "scroll_page", "move_mouse", "_dismiss_popup_no_login"):
+        monkeypatch.setattr(fb, name, noop)
+
+    batches = [[{"texts": ["K800", "2 bedroom flat", "Gerehu"], "href": "/marketplace/item/1/"}]]
+    calls = []
+
+    class FakePage:
+        url = "https://www.facebook.com/marketplace/category/propertyrentals"
+        async def evaluate(self, js, arg):
+            calls.append(arg["cardSels"])
+            fresh = batches.pop(0) if batches else []
+            return {"total": 1, "fresh": fresh}
+
+    scraper = fb.FacebookScraper(scroll_rounds=10)
+    scraper._page = FakePage()
+    async def goto(url, **kw): return True
+    scraper._goto = goto
+
+    results = asyncio.run(scraper.scrape(None))
+    assert len(results) == 1
+    # One productive round, then two stale ones
+    assert len(calls) == 3
+
+def test_fetch_many_reuses_a_bounded_page_pool():
+    from png_scraper.engine import PNGScraper
+
+    opened, closed = [], []
+
+    class FakePage:
+        async def close(self): closed.append(self)
+
+    class FakeContext:
+        async def new_page(self):
+            opened.append(FakePage())
+            return opened[-1]
+
+    async def goto(url, wait_until="load", page=None): return True
+    async def parser(page, url):
+        await asyncio.sleep(0)
+        return url
+
+    class Scraper(PNGScraper):
+        async def scrape(self, context, on_progress=None): return []
+
+    scraper = Scraper()
+    scraper._goto = goto
+    urls = [f"https://x.test/{n}" for n in range(7)]
+    assert asyncio.run(scraper._fetch_many(FakeContext(), urls, parser, max_parallel=3)) == urls
+    assert len(opened) == 3 and sorted(map(id, closed)) == sorted(map(id, opened))
+
+def test_agency_head_probe_stops_at_missing_page():
+    import httpx
+    from png_scraper.scrapers.general_agency import GeneralAgencyScraper, SiteConfig
+
+    def handler(request):
+        path = request.url.path
+        if path == "/rent/page/3/":
+            return httpx.Response(301, headers={"Location": "https://agency.test/rent/"})
+        if path == "/rent/page/5/":
+            return httpx.Response(404)
+        if path == "/rent/page/2/":
+            return httpx.Response(405)            # HEAD not allowed: inconclusive, keep
+        return httpx.Response(200)
+
+    async def go(urls):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True) as client:
+            scraper = GeneralAgencyScraper(SiteConfig("Test Agency", "https://agency.test/rent/"), client=client)
+            return await scraper._probe_pages(urls)
+
+    urls = [f"https://agency.test/rent/page/{n}/" for n in range(2, 6)]
+    assert asyncio.run(go(urls)) == urls[:1]
+    assert asyncio.run(go([urls[0], urls[3]])) == [urls[0]]
+
+def test_agency_head_probe_without_client_leaves_cookie_jar(tmp_path, monkeypatch):
+    import httpx
+    from png_scraper import engine
+    from png_scraper.scrapers.general_agency import GeneralAgencyScraper, SiteConfig
+
+    jar = tmp_path / "cookies.json"
+    before = '[{"name": "sid", "value": "1", "domain": "agency.test", "path": "/"}]'
+    jar.write_text(before)
+    monkeypatch.setattr(engine, "COOKIE_FILE", jar)
+    real = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real(transport=httpx.MockTransport(
+        lambda r: httpx.Response(404 if r.url.path == "/rent/page/3/" else 200, headers={"Set-Cookie": "sid=2"})), **kw))
+
+    urls = ["https://agency.test/rent/page/2/", "https://agency.test/rent/page/3/"]
+    scraper = GeneralAgencyScraper(SiteConfig("Test Agency", "https://agency.test/rent/"))
+    assert asyncio.run(scraper._probe_pages(urls)) == urls[:1]
+    assert jar.read_text() == before
+
+def test_portal_cards_from_extracted_fields():
+    from png_scraper.scrapers.hausples import HausplesScraper
+    from png_scraper.scrapers import professionals
+
+    h = HausplesScraper()._parse_card({"title": "", "price": "K2,500 per month", "location": "Gordons",
+                                        "href": "/property/3-bedroom-house", "text": "3 bedroom house"})
+    assert h.listing_url == "https://www.hausples.com.pg/property/3-bedroom-house"
+    assert h.title == "3 Bedroom House"
+    assert (h.price_monthly_k, h.bedrooms) == (2500, 3)
+
+    p = professionals._parse_card({"title": "", "price": "K4,000 per month", "location": "Waigani",
+                                   "beds": "2 Bedrooms", "href": "/property/9"})
+    assert p.listing_url == "https://theprofessionals.com.pg/property/9"
+    assert p.title == "Property — Waigani"
+    assert p.bedrooms == 2
+    assert professionals._parse_card({"title": "x", "price": "", "location": "", "beds": "", "href": ""}) is None
+
+def test_hausples_pages_fetched_concurrently_in_order():
+    from png_scraper.scrapers.hausples import HausplesScraper
+
+    class FakePage:
+        async def close(self): pass
+
+    class FakeContext:
+        async def route(self, *a): pass
+        async def new_page(self): return FakePage()
+
+    scraper = HausplesScraper(max_pages=5)
+    scraper._page = FakePage()
+    visited = []
+
+    async def goto(url, wait_until="load", page=None):
+        visited.append(url)
+        return True
+
+    async def parse_page(page, url, skip=frozenset()):
+        n = int(url.rsplit("=", 1)[1]) if "?page=" in url else 1
+        if n == 4: return []                    # empty page ends pagination
+        return [scraper._parse_card({"title": f"House {n}", "price": "K2000", "location": "Boroko",
+                                     "href": f"/property/{n}", "text": ""})]
+
+    async def has_next(page): return True
+    scraper._goto, scraper._parse_page, scraper._has_next = goto, parse_page, has_next
+
+    results = asyncio.run(scraper.scrape(FakeContext()))
+    assert [l.title for l in results] == ["House 1", "House 2", "House 3"]
+    assert len(visited) == 5
+
+def test_professionals_static_pages(monkeypatch):
+    import httpx
+    import pytest
+    pytest.importorskip("selectolax.lexbor")
+    from png_scraper.scrapers import professionals as pro
+
+    def page(n, nxt=True):
+        return f"""<div class="listings-container">
+          <article class="property-item"><div class="item-title"><h2><a href="/property/{n}">House {n}</a></h2></div>
+            <div class="item-price">K3,000 per month</div><div class="item-address">Boroko</div>
+            <span class="bedrooms">3 Bedrooms</span></article></div>
+          {'<a class="next" href="#">Next</a>' if nxt else ''}"""
+
+    def handler(request):
+        path = request.url.path
+        if path == "/rent/": return httpx.Response(200, text=page(1))
+        if path == "/rent/page/2/": return httpx.Response(200, text=page(2))
+        return httpx.Response(404)
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await pro.ProfessionalsScraper(max_pages=4, client=client)._scrape_http()
+
+    results = asyncio.run(go())
+    assert [l.listing_url for l in results] == ["https://theprofessionals.com.pg/property/1",
+                                                 "https://theprofessionals.com.pg/property/2"]
+    assert results[0].title == "House 1" and results[0].bedrooms == 3
+
+def test_static_fetch_saves_private_client_cookies(tmp_path, monkeypatch):
+    import httpx
+    import pytest
+    pytest.importorskip("selectolax.lexbor")
+    from png_scraper import engine
+    from png_scraper.scrapers import professionals as pro
+    monkeypatch.setattr(engine, "COOKIE_FILE", tmp_path / "cookies.json")
+
+    def handler(request):
+        return httpx.Response(200, text="<p>no cards</p>", headers={"Set-Cookie": "sid=abc; Path=/"})
+
+    monkeypatch.setattr(engine, "new_http_client",
+                        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    assert asyncio.run(pro.ProfessionalsScraper(max_pages=1)._scrape_http()) == []
+    # No shared client: the private one's cookies are persisted on close
+    assert "abc" in (tmp_path / "cookies.json").read_text()